@@ -3,6 +3,17 @@ ComfyUI Prompt Preset Selector
 A simple node for selecting text presets from external files
 """
 
-from .nodes import NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+from .nodes import (
+    NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS,
+    WARM_UP_PRESET_FILES, WATCH_PRESET_FILES, start_preset_watcher, warm_up_preset_files,
+)
+
+if WARM_UP_PRESET_FILES:
+    # Parse and index every preset file in the background (PROMPT_PRESET_WARMUP=1)
+    warm_up_preset_files()
+
+if WATCH_PRESET_FILES:
+    # Re-parse edited preset files in the background (PROMPT_PRESET_WATCH=1)
+    start_preset_watcher()
 
 __all__ = ['NODE_CLASS_MAPPINGS', 'NODE_DISPLAY_NAME_MAPPINGS']
@@ -2,22 +2,2132 @@
 Prompt Preset Selector Node for ComfyUI (Enhanced Version)
 Allows selection of text presets from external .txt and .yaml files with:
 - Sequential and random selection modes
-- Keyword filtering with AND/OR/phrase search
+- Keyword filtering with AND/OR/regex/fuzzy/phrase search
 - Preset list display for easy reference
 - Absolute path support
 """
 
+import atexit
+import fnmatch
+import hashlib
+import json
+import marshal
+import math
 import os
 import random
 import re
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 from pathlib import Path
 try:
     import yaml
     YAML_AVAILABLE = True
+    # libyaml's C loader is much faster; fall back to the pure-Python one
+    YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 except ImportError:
     YAML_AVAILABLE = False
     print("[Prompt Preset Selector] Warning: PyYAML not installed. YAML support disabled.")
     print("  Install with: pip install pyyaml --break-system-packages")
+try:
+    # Optional: vectorizes Shuffle index generation for batch runs
+    import numpy
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+try:
+    # Optional: lets the file watcher use inotify instead of polling (Linux)
+    from inotify_simple import INotify, flags as inotify_flags
+    INOTIFY_AVAILABLE = True
+except ImportError:
+    INOTIFY_AVAILABLE = False
+
+
+# Cache budget (override with environment variables if needed)
+PRESET_CACHE_MAX_FILES = int(os.environ.get("PROMPT_PRESET_CACHE_MAX_FILES", "64"))
+PRESET_CACHE_MAX_BYTES = int(os.environ.get("PROMPT_PRESET_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Number of distinct keyword queries whose filter results are kept
+FILTER_CACHE_MAX_QUERIES = 256
+
+# Selection modes that advance a stored cursor on every execution
+STATEFUL_SELECTION_MODES = ("Sequential (continue)", "Shuffle")
+
+# preset_list output options
+PRESET_LIST_MODES = ["Full", "Page", "Off"]
+PRESET_LIST_DEFAULT_PAGE_SIZE = 100
+
+# Files with at least this many presets are stored as CompactLines
+COMPACT_MIN_LINES = int(os.environ.get("PROMPT_PRESET_COMPACT_MIN_LINES", "10000"))
+
+# .txt files of at least this size are read through a memory-mapped line index
+# (0 disables; off by default on Windows, where a mapped file cannot be truncated by editors)
+MMAP_MIN_BYTES = int(os.environ.get("PROMPT_PRESET_MMAP_MIN_BYTES", "0" if os.name == "nt" else str(8 * 1024 * 1024)))
+
+# Where persisted indexes are stored
+CACHE_DIR = Path(os.environ.get("PROMPT_PRESET_CACHE_DIR", Path(__file__).parent / ".cache"))
+
+# Number of compiled wildcard templates kept
+TEMPLATE_CACHE_MAX = 1024
+
+# Number of wildcard files whose __name__ references are remembered for IS_CHANGED
+WILDCARD_REFERENCE_CACHE_MAX = 4096
+
+# Number of folder/glob selections whose merged file lists are kept
+CORPUS_CACHE_MAX = 16
+
+# Number of folders entered in absolute_path whose file indexes are kept
+DIRECTORY_INDEX_CACHE_MAX = 16
+
+# Save parsed YAML files as marshal snapshots in CACHE_DIR for faster cold starts
+YAML_SNAPSHOTS = os.environ.get("PROMPT_PRESET_YAML_SNAPSHOTS", "0") == "1"
+
+# Files smaller than this are searched by a plain scan (an index would not pay off)
+SEARCH_INDEX_MIN_LINES = 256
+
+# keyword_mode options
+KEYWORD_MODES = ["OFF", "AND", "OR", "REGEX", "FUZZY"]
+# FUZZY keeps presets sharing at least this fraction of the keywords' trigrams
+FUZZY_MIN_SCORE = float(os.environ.get("PROMPT_PRESET_FUZZY_MIN_SCORE", "0.5"))
+# Number of compiled REGEX keyword patterns kept
+KEYWORD_PATTERN_CACHE_MAX = 256
+
+# Watch the preset and wildcard directories in a background thread and re-parse
+# cached files as soon as they change (polls every WATCH_INTERVAL_SECONDS without inotify)
+WATCH_PRESET_FILES = os.environ.get("PROMPT_PRESET_WATCH", "0") == "1"
+WATCH_INTERVAL_SECONDS = float(os.environ.get("PROMPT_PRESET_WATCH_INTERVAL", "2"))
+
+# Load and index every preset file in a background thread pool at startup
+WARM_UP_PRESET_FILES = os.environ.get("PROMPT_PRESET_WARMUP", "0") == "1"
+WARM_UP_WORKERS = int(os.environ.get("PROMPT_PRESET_WARMUP_WORKERS", "4"))
+
+# Where Sequential (continue), Shuffle and sequential wildcard cursors are kept:
+# "memory" (lost on restart) or "sqlite" (CURSOR_DB_PATH, survives restarts)
+CURSOR_STORE = os.environ.get("PROMPT_PRESET_CURSOR_STORE", "memory")
+CURSOR_DB_PATH = Path(os.environ.get("PROMPT_PRESET_CURSOR_DB", CACHE_DIR / "cursors.sqlite3"))
+# Least recently used cursors beyond this many are forgotten
+CURSOR_STORE_MAX_KEYS = int(os.environ.get("PROMPT_PRESET_CURSOR_MAX_KEYS", "10000"))
+# Seconds changed cursors are batched before they are written to the database
+CURSOR_FLUSH_SECONDS = float(os.environ.get("PROMPT_PRESET_CURSOR_FLUSH_SECONDS", "2"))
+
+
+class LRUCache:
+    """
+    Small bounded mapping that evicts the least recently used key (thread-safe)
+    on_evict(value) is called (outside the lock) for every value evicted or replaced
+    """
+    
+    def __init__(self, maxsize, on_evict=None):
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+    
+    def put(self, key, value):
+        evicted = []
+        with self._lock:
+            if key in self._data and self._data[key] is not value:
+                evicted.append(self._data[key])
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False)[1])
+        if self.on_evict is not None:
+            for old in evicted:
+                self.on_evict(old)
+    
+    def clear(self):
+        with self._lock:
+            evicted = list(self._data.values())
+            self._data.clear()
+        if self.on_evict is not None:
+            for old in evicted:
+                self.on_evict(old)
+    
+    def __len__(self):
+        return len(self._data)
+
+
+_TXT_LINE_PATTERN = re.compile(r'[^\r\n]+')
+
+
+def parse_txt_presets(text):
+    """
+    Split .txt content into presets with the same rules as load_txt_presets
+    (universal newlines, stripped, empty lines and # comments skipped)
+    """
+    presets = []
+    for match in _TXT_LINE_PATTERN.finditer(text):
+        stripped = match.group().strip()
+        if stripped and not stripped.startswith('#'):
+            presets.append(stripped)
+    return presets
+
+
+class TxtPresetList(list):
+    """Presets parsed from a .txt file, with the sha1 of exactly the bytes they were parsed from"""
+    
+    content_digest = None
+
+
+# Optional "weight::" prefix of a preset line, e.g. "3::golden hour" or "0.5::rare style"
+_WEIGHT_PREFIX_PATTERN = re.compile(r'(\d+(?:\.\d*)?|\.\d+)::')
+
+# Substring that every weighted line contains (cheap test for files without weights)
+WEIGHT_MARKER = "::"
+
+
+def split_weight(line):
+    """Split the optional weight prefix off a preset line; returns (weight, text)"""
+    match = _WEIGHT_PREFIX_PATTERN.match(line)
+    if match is None:
+        return 1.0, line
+    return float(match.group(1)), line[match.end():]
+
+
+def format_weight(weight):
+    """Write a weight the way split_weight reads it back: plain digits, no exponent, no rounding"""
+    text = format(Decimal(repr(float(weight))), 'f')
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    return text
+
+
+def deep_sizeof(obj):
+    """Approximate memory held by obj and the containers and strings it references (each object counted once)"""
+    seen = set()
+    total = 0
+    pending = [obj]
+    while pending:
+        item = pending.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            pending.extend(item)
+    return total
+
+
+def hash_file_prefix(f, size):
+    """
+    Hash the first size bytes of an open binary file
+    Returns (sha1 hasher, last byte read), or (None, b'') if the file is shorter
+    """
+    hasher = hashlib.sha1()
+    last = b''
+    remaining = size
+    while remaining:
+        chunk = f.read(min(remaining, 1 << 20))
+        if not chunk:
+            return None, b''
+        hasher.update(chunk)
+        last = chunk[-1:]
+        remaining -= len(chunk)
+    return hasher, last
+
+
+class CompactLines:
+    """
+    Read-only sequence of lines stored as one text buffer plus an offsets table
+    
+    Lines are joined with "\n" into a single string and offsets[i] is where
+    line i starts (offsets[-1] is one past the end), so a million lines cost
+    one string plus 4-8 bytes each instead of one str object per line.
+    A line is only materialized when it is accessed.
+    """
+    
+    __slots__ = ('text', 'offsets')
+    
+    def __init__(self, text, offsets):
+        self.text = text
+        self.offsets = offsets
+    
+    @classmethod
+    def from_lines(cls, lines):
+        """Build from any iterable of strings"""
+        parts = []
+        positions = [0]
+        pos = 0
+        for line in lines:
+            parts.append(line)
+            pos += len(line) + 1
+            positions.append(pos)
+        typecode = 'I' if pos < 2 ** 32 else 'Q'
+        return cls("\n".join(parts), array(typecode, positions))
+    
+    def __len__(self):
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+        return self.text[self.offsets[index]:self.offsets[index + 1] - 1]
+    
+    def __iter__(self):
+        text, offsets = self.text, self.offsets
+        for i in range(len(offsets) - 1):
+            yield text[offsets[i]:offsets[i + 1] - 1]
+    
+    def line_of(self, pos):
+        """Return the line number containing text position pos"""
+        return bisect_right(self.offsets, pos) - 1
+    
+    def extended(self, lines):
+        """Return a new CompactLines with lines appended (self is not modified)"""
+        tail = CompactLines.from_lines(lines)
+        if not len(tail):
+            return self
+        if not len(self):
+            return tail
+        
+        base = len(self.text) + 1
+        end = base + tail.offsets[-1]
+        offsets = array('I' if end < 2 ** 32 else 'Q', self.offsets)
+        offsets.extend(base + offset for offset in tail.offsets[1:])
+        return CompactLines(self.text + "\n" + tail.text, offsets)
+    
+    def text_contains(self, substring):
+        """True if substring occurs anywhere in the text (may span lines)"""
+        return substring in self.text
+
+
+class IndexedTxtLines:
+    """
+    Read-only sequence of the presets in a .txt file, read on demand
+    
+    spans holds the (start, end) byte offsets of every stripped, non-comment
+    line, so accessing one preset reads only that line's bytes from an open
+    handle. The spans are persisted in CACHE_DIR and reused until the file's
+    mtime/size changes. Plain reads (not mmap) keep a file that is rewritten
+    in place from faulting the process; such reads just come back short
+    until the cache notices the new version.
+    """
+    
+    _HEADER = struct.Struct('=8sqQQ20s4x')  # magic, mtime_ns, size, line count, sha1 of content
+    _MAGIC = b'PPLIDX02'
+    _LINE_PATTERN = re.compile(rb'[^\r\n]+')
+    _CHUNK_BYTES = 1024 * 1024
+    
+    def __init__(self, file, size, spans, content_digest):
+        self._file = file
+        self._size = size
+        self._spans = spans
+        self.content_digest = content_digest
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def open(cls, file_path, version=None):
+        """
+        Open file_path and load (or build and persist) its line index
+        Only the first version[1] bytes are indexed (the size when version was taken)
+        """
+        if version is None:
+            version = PresetFileCache.file_version(file_path)
+        f = open(file_path, 'rb')
+        try:
+            loaded = cls._load_index(file_path, version)
+            if loaded is not None:
+                return cls(f, version[1], *loaded)
+            
+            content = f.read(version[1])
+            spans = cls._scan(content, 0)
+            content_digest = hashlib.sha1(content).hexdigest()
+        except BaseException:
+            f.close()
+            raise
+        cls._save_index(file_path, version, spans, content_digest)
+        return cls(f, version[1], spans, content_digest)
+    
+    def extended(self, file_path, old_size, version, content_digest):
+        """
+        Return a new IndexedTxtLines for file_path after data was appended
+        Only the bytes after old_size are scanned
+        """
+        f = open(file_path, 'rb')
+        try:
+            f.seek(old_size)
+            tail = f.read(version[1] - old_size)
+        except BaseException:
+            f.close()
+            raise
+        spans = array('Q', self._spans)
+        spans.extend(self._scan(tail, old_size))
+        self._save_index(file_path, version, spans, content_digest)
+        return IndexedTxtLines(f, version[1], spans, content_digest)
+    
+    @classmethod
+    def _scan(cls, content, base):
+        """Find the byte spans (offset by base) of all preset lines in content (same rules as load_txt_presets)"""
+        spans = array('Q')
+        # Text mode splits on \n, \r\n and \r; none of them occur inside a UTF-8 sequence
+        for match in cls._LINE_PATTERN.finditer(content):
+            text = match.group().decode('utf-8')
+            stripped = text.strip()
+            if not stripped or stripped.startswith('#'):
+                continue
+            
+            start = base + match.start()
+            if len(stripped) == len(text):
+                end = base + match.end()
+            else:
+                start += len(text[:len(text) - len(text.lstrip())].encode('utf-8'))
+                end = start + len(stripped.encode('utf-8'))
+            spans.append(start)
+            spans.append(end)
+        return spans
+    
+    @staticmethod
+    def _index_path(file_path):
+        digest = hashlib.sha1(str(file_path).encode('utf-8')).hexdigest()
+        return CACHE_DIR / f"{digest}.lineidx"
+    
+    @classmethod
+    def _load_index(cls, file_path, version):
+        try:
+            with open(cls._index_path(file_path), 'rb') as f:
+                header = f.read(cls._HEADER.size)
+                magic, mtime_ns, size, count, digest = cls._HEADER.unpack(header)
+                if magic != cls._MAGIC or (mtime_ns, size) != version:
+                    return None
+                spans = array('Q')
+                spans.fromfile(f, count * 2)
+                if f.read(1):
+                    return None
+            return spans, digest.hex()
+        except (OSError, EOFError, ValueError, struct.error):
+            return None
+    
+    @classmethod
+    def _save_index(cls, file_path, version, spans, content_digest):
+        index_path = cls._index_path(file_path)
+        tmp_path = index_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(cls._HEADER.pack(cls._MAGIC, version[0], version[1], len(spans) // 2, bytes.fromhex(content_digest)))
+                spans.tofile(f)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            print(f"[Prompt Preset Selector] Warning: Could not save line index for {file_path}: {e}")
+    
+    @property
+    def nbytes(self):
+        """Memory held outside the page cache (the file itself is not counted)"""
+        return len(self._spans) * 8
+    
+    def _read(self, start, end):
+        with self._lock:
+            self._file.seek(start)
+            return self._file.read(end - start)
+    
+    def _chunks(self, overlap=0):
+        """Yield the indexed bytes of the file in chunks, each starting overlap bytes before the previous end"""
+        position = 0
+        while position < self._size:
+            chunk = self._read(max(position - overlap, 0), min(position + self._CHUNK_BYTES, self._size))
+            if not chunk:
+                return
+            yield chunk
+            position += self._CHUNK_BYTES
+    
+    def text_contains(self, substring):
+        """True if substring occurs anywhere in the indexed bytes (comment lines included)"""
+        needle = substring.encode('utf-8')
+        return any(needle in chunk for chunk in self._chunks(max(len(needle) - 1, 0)))
+    
+    def __len__(self):
+        return len(self._spans) // 2
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+        return self._read(self._spans[2 * index], self._spans[2 * index + 1]).decode('utf-8', errors='replace')
+    
+    def __iter__(self):
+        # One sequential pass per chunk instead of a seek per line
+        spans = self._spans
+        i = 0
+        count = len(self)
+        while i < count:
+            chunk_start = spans[2 * i]
+            chunk_end = chunk_start + self._CHUNK_BYTES
+            j = i
+            while j < count and spans[2 * j + 1] <= chunk_end:
+                j += 1
+            j = max(j, i + 1)
+            chunk = self._read(chunk_start, spans[2 * j - 1])
+            for k in range(i, j):
+                yield chunk[spans[2 * k] - chunk_start:spans[2 * k + 1] - chunk_start].decode('utf-8', errors='replace')
+            i = j
+
+
+class CorpusLines:
+    """
+    Read-only concatenation of several line sequences
+    
+    offsets[k] is the index of the first line of part k (offsets[-1] is the
+    total), so line i is found with a binary search and read from its part;
+    the parts' lines are never copied.
+    """
+    
+    __slots__ = ('parts', 'offsets')
+    
+    def __init__(self, parts):
+        self.parts = parts
+        self.offsets = [0]
+        for part in parts:
+            self.offsets.append(self.offsets[-1] + len(part))
+    
+    def __len__(self):
+        return self.offsets[-1]
+    
+    def locate(self, index):
+        """Return (part number, index within the part) of line index"""
+        part = bisect_right(self.offsets, index) - 1
+        return part, index - self.offsets[part]
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+        part, local = self.locate(index)
+        return self.parts[part][local]
+    
+    def __iter__(self):
+        for part in self.parts:
+            yield from part
+
+
+_keyword_pattern_cache = LRUCache(KEYWORD_PATTERN_CACHE_MAX)
+
+
+def compile_keyword_pattern(pattern):
+    """
+    Compile a REGEX mode keyword (case-insensitive, ^/$ match at line ends)
+    Compiled patterns are cached; raises re.error for an invalid pattern
+    """
+    compiled = _keyword_pattern_cache.get(pattern)
+    if compiled is None:
+        compiled = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+        _keyword_pattern_cache.put(pattern, compiled)
+    return compiled
+
+
+def line_trigrams(text):
+    """Set of trigrams of text padded with a space on each side (so word edges count)"""
+    padded = f" {text} "
+    return {padded[j:j + 3] for j in range(len(padded) - 2)}
+
+
+def keyword_trigrams(keywords):
+    """Trigrams a FUZZY query scores lines by"""
+    grams = set()
+    for kw in keywords:
+        grams |= line_trigrams(kw.lower())
+    return grams
+
+
+class PresetSearchIndex:
+    """
+    Keyword search index over the lines of one preset file
+    
+    Holds a lowercased copy of every line as CompactLines and, for larger
+    files, a trigram -> line numbers inverted index. Keywords are found with
+    str.find over the whole lowercased buffer, or (3+ characters, indexed
+    files) looked up through their rarest trigram with only those candidate
+    lines checked, so results are identical to a case-insensitive substring scan.
+    FUZZY queries always use the trigram index (built on first use).
+    charge(nbytes), when set, is told the size of the postings once they are built.
+    """
+    
+    def __init__(self, lines, use_trigrams=True):
+        self.lowered = CompactLines.from_lines(line.lower() for line in lines)
+        self.use_trigrams = use_trigrams and len(lines) >= SEARCH_INDEX_MIN_LINES
+        self.charge = None
+        self._postings = None
+        self._postings_bytes = 0
+        self._lock = threading.Lock()
+    
+    def extended(self, lines):
+        """
+        Return a new index with lines appended (self is not modified)
+        Existing trigram postings are reused; only the new lines are indexed
+        """
+        base = len(self.lowered)
+        lowered = [line.lower() for line in lines]
+        
+        index = PresetSearchIndex.__new__(PresetSearchIndex)
+        index.lowered = self.lowered.extended(lowered)
+        index.use_trigrams = len(index.lowered) >= SEARCH_INDEX_MIN_LINES
+        index.charge = None
+        index._postings = None
+        index._postings_bytes = 0
+        index._lock = threading.Lock()
+        
+        if self._postings is not None:
+            added = defaultdict(list)
+            for i, text in enumerate(lowered, base):
+                for gram in line_trigrams(text):
+                    added[gram].append(i)
+            postings = dict(self._postings)
+            for gram, ids in added.items():
+                postings[gram] = postings.get(gram, array('I')) + array('I', ids)
+            index._postings = postings
+            index._postings_bytes = deep_sizeof(postings)
+        return index
+    
+    @property
+    def nbytes(self):
+        """Memory held by the lowercased copy and the postings built so far"""
+        return sys.getsizeof(self.lowered.text) + sys.getsizeof(self.lowered.offsets) + self._postings_bytes
+    
+    def _build_postings(self):
+        with self._lock:
+            if self._postings is not None:
+                return
+            postings = defaultdict(list)
+            for i, text in enumerate(self.lowered):
+                for gram in line_trigrams(text):
+                    postings[gram].append(i)
+            postings = {gram: array('I', ids) for gram, ids in postings.items()}
+            self._postings_bytes = deep_sizeof(postings)
+            self._postings = postings
+            if self.charge is not None:
+                self.charge(self._postings_bytes)
+    
+    def _scan(self, kw):
+        """Find kw in the whole buffer, skipping to the next line after each hit"""
+        text, offsets = self.lowered.text, self.lowered.offsets
+        result = []
+        pos = text.find(kw)
+        while pos != -1:
+            i = self.lowered.line_of(pos)
+            if pos + len(kw) < offsets[i + 1]:
+                result.append(i)
+                pos = text.find(kw, offsets[i + 1])
+            else:
+                # Match runs across the line separator
+                pos = text.find(kw, pos + 1)
+        return result
+    
+    def find(self, keyword):
+        """Return ascending line numbers whose text contains keyword (case-insensitive)"""
+        kw = keyword.lower()
+        if not kw:
+            return list(range(len(self.lowered)))
+        
+        if not self.use_trigrams or len(kw) < 3:
+            return self._scan(kw)
+        
+        if self._postings is None:
+            self._build_postings()
+        
+        candidates = None
+        for j in range(len(kw) - 2):
+            posting = self._postings.get(kw[j:j + 3])
+            if posting is None:
+                return []
+            if candidates is None or len(posting) < len(candidates):
+                candidates = posting
+        
+        text, offsets = self.lowered.text, self.lowered.offsets
+        return [i for i in candidates if text.find(kw, offsets[i], offsets[i + 1] - 1) != -1]
+    
+    def find_regex(self, pattern):
+        """
+        Return ascending line numbers containing a match of the regular expression pattern
+        The whole buffer is searched at once, skipping to the next line after each hit
+        """
+        regex = compile_keyword_pattern(pattern)
+        text, offsets = self.lowered.text, self.lowered.offsets
+        result = []
+        pos = 0
+        while True:
+            match = regex.search(text, pos)
+            if match is None:
+                return result
+            i = self.lowered.line_of(match.start())
+            end = offsets[i + 1] - 1
+            # A match running across the line separator may still have one within the line
+            if match.end() <= end or regex.search(text, match.start(), end):
+                result.append(i)
+            pos = end + 1
+    
+    def find_fuzzy(self, keywords, min_score=FUZZY_MIN_SCORE):
+        """
+        Return line numbers sharing at least min_score of the keywords' trigrams,
+        best score first (ties keep file order)
+        """
+        grams = keyword_trigrams(keywords)
+        if not grams:
+            return list(range(len(self.lowered)))
+        
+        if self._postings is None:
+            self._build_postings()
+        
+        counts = Counter()
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is not None:
+                counts.update(posting)
+        
+        needed = min_score * len(grams)
+        return sorted((i for i, count in counts.items() if count >= needed), key=lambda i: (-counts[i], i))
+    
+    def query(self, include_keywords, exclude_keywords, mode):
+        """
+        Return line numbers matching include keywords and none of the exclude keywords
+        
+        AND/OR: substrings, all or any of them; REGEX: every include keyword is a
+        regular expression that must match (exclude keywords are regular expressions too);
+        FUZZY: trigram similarity to the include keywords (exclude keywords are substrings).
+        Results are ascending, except FUZZY which is ranked by score.
+        """
+        find = self.find_regex if mode == "REGEX" else self.find
+        ranked = None
+        if include_keywords and mode != "OFF":
+            if mode == "FUZZY":
+                ranked = self.find_fuzzy(include_keywords)
+                selected = set(ranked)
+            else:
+                matches = [set(find(kw)) for kw in include_keywords]
+                if mode in ("AND", "REGEX"):
+                    selected = set.intersection(*matches)
+                elif mode == "OR":
+                    selected = set.union(*matches)
+                else:
+                    selected = set()
+        else:
+            selected = None  # All lines
+        
+        if exclude_keywords:
+            excluded = set()
+            for kw in exclude_keywords:
+                excluded.update(find(kw))
+            if selected is None:
+                return [i for i in range(len(self.lowered)) if i not in excluded]
+            selected -= excluded
+        
+        if selected is None:
+            return list(range(len(self.lowered)))
+        if ranked is not None:
+            return [i for i in ranked if i in selected]
+        return sorted(selected)
+
+
+class PresetFileEntry:
+    """
+    Parsed contents of one version of a preset file
+    version is (mtime_ns, size) of the file when it was parsed
+    
+    Structures derived from the lines (search index, preset list, alias
+    tables, YAML data) are charged to derived_bytes as they are built, and
+    through cache to the byte budget of the PresetFileCache holding the entry.
+    """
+    
+    def __init__(self, path, version, lines):
+        self.path = path
+        self.version = version
+        self.lines = lines
+        self.derived_bytes = 0
+        # PresetFileCache this entry was stored in, if any
+        self.cache = None
+        self._build_lock = threading.Lock()
+        # sha1 of the file content (.txt only), used to detect append-only growth
+        self.content_digest = None
+        # Parsed YAML structure and its key index (YAML files only, see PromptPresetSelectorWithWildcard)
+        self.yaml_data = None
+        self.yaml_key_index = None
+        self._search_index = None
+        self._preset_list = None
+        self._alias_tables = LRUCache(FILTER_CACHE_MAX_QUERIES, on_evict=self._refund_alias_table)
+        self._wildcard_references = None
+    
+    def charge(self, nbytes):
+        """Add nbytes (negative to refund) to the cost of the derived structures"""
+        if self.cache is None:
+            self.derived_bytes += nbytes
+        else:
+            self.cache.charge(self, nbytes)
+    
+    def derive(self, attribute, build, size=deep_sizeof):
+        """Return attribute, building it once with build() and charging size(value) if it is None"""
+        value = getattr(self, attribute)
+        if value is None:
+            with self._build_lock:
+                value = getattr(self, attribute)
+                if value is None:
+                    value = build()
+                    self.charge(size(value))
+                    setattr(self, attribute, value)
+        return value
+    
+    def _build_search_index(self):
+        index = PresetSearchIndex(self.lines)
+        index.charge = self.charge
+        return index
+    
+    @property
+    def search_index(self):
+        """Keyword search index, built on first use"""
+        return self.derive('_search_index', self._build_search_index, lambda index: index.nbytes)
+    
+    @property
+    def preset_list(self):
+        """Full numbered preset list, rendered on first use"""
+        return self.derive(
+            '_preset_list',
+            lambda: "\n".join(f"{i}: {line}" for i, line in enumerate(self.lines)),
+            sys.getsizeof
+        )
+    
+    def text_contains(self, substring):
+        """True if substring may occur in a line (checked on the whole buffer when possible)"""
+        text_contains = getattr(self.lines, 'text_contains', None)
+        if text_contains is not None:
+            return text_contains(substring)
+        return any(substring in line for line in self.lines)
+    
+    @property
+    def has_weight_markers(self):
+        """False if no line can carry a weight prefix (the file is unweighted)"""
+        return self.text_contains(WEIGHT_MARKER)
+    
+    @property
+    def wildcard_references(self):
+        """Names of the __name__ wildcards used anywhere in the file, found on first use"""
+        if self._wildcard_references is None:
+            names = set()
+            if self.text_contains("__"):
+                for line in self.lines:
+                    names.update(WildcardTemplate._FILE_PATTERN.findall(line))
+            self._wildcard_references = frozenset(names)
+        return self._wildcard_references
+    
+    def alias_table(self, key, choices):
+        """
+        AliasTable over the weights of choices (strings with optional weight
+        prefixes), or None when none of them is weighted
+        Tables are kept per key with this version, so choices is only read once
+        """
+        table = self._alias_tables.get(key)
+        if table is None:
+            weights = array('d', (split_weight(choice)[0] for choice in choices))
+            # False marks "unweighted" so the scan is not repeated
+            table = AliasTable(weights) if any(weight != 1.0 for weight in weights) else False
+            if table:
+                self.charge(table.nbytes)
+            self._alias_tables.put(key, table)
+        return table or None
+    
+    def _refund_alias_table(self, table):
+        if table:
+            self.charge(-table.nbytes)
+    
+    def line_alias_table(self, query, indices):
+        """AliasTable over lines[i] for i in indices (the result of keyword query), or None"""
+        if not self.has_weight_markers:
+            return None
+        lines = self.lines
+        return self.alias_table(("lines",) + query, (lines[i] for i in indices))
+    
+    def warm_like(self, old):
+        """Build the derived indexes old had built, so this entry can replace it warm"""
+        if old._search_index is not None:
+            self.search_index
+        if old._preset_list is not None:
+            self.preset_list
+        if old._wildcard_references is not None:
+            self.wildcard_references
+    
+    def append_from(self, file_path, version):
+        """
+        Return a new entry for version of file_path if the file only grew by
+        appending since this entry was parsed, or None if it must be reloaded
+        Only the appended tail is parsed; derived indexes are extended
+        """
+        old_size = self.version[1]
+        if self.content_digest is None or version[1] <= old_size:
+            return None
+        
+        try:
+            with open(file_path, 'rb') as f:
+                hasher, last = hash_file_prefix(f, old_size)
+                # The old content must end on a line break, or the tail would continue its last line
+                if hasher is None or hasher.hexdigest() != self.content_digest or last not in (b'\n', b'\r'):
+                    return None
+                tail = f.read(version[1] - old_size)
+            hasher.update(tail)
+            new_lines = parse_txt_presets(tail.decode('utf-8'))
+        except (OSError, UnicodeDecodeError):
+            return None
+        
+        if isinstance(self.lines, IndexedTxtLines):
+            lines = self.lines.extended(file_path, old_size, version, hasher.hexdigest())
+        elif isinstance(self.lines, CompactLines):
+            lines = self.lines.extended(new_lines)
+        else:
+            lines = self.lines + new_lines
+            if len(lines) >= COMPACT_MIN_LINES:
+                lines = CompactLines.from_lines(lines)
+        
+        entry = PresetFileEntry(self.path, version, lines)
+        entry.content_digest = hasher.hexdigest()
+        if self._search_index is not None:
+            entry._search_index = self._search_index.extended(new_lines)
+            entry._search_index.charge = entry.charge
+            entry.charge(entry._search_index.nbytes)
+        if self._preset_list is not None:
+            base = len(self.lines)
+            rendered = "\n".join(f"{i}: {line}" for i, line in enumerate(new_lines, base))
+            entry._preset_list = "\n".join(part for part in (self._preset_list, rendered) if part)
+            entry.charge(sys.getsizeof(entry._preset_list))
+        return entry
+    
+    @property
+    def nbytes(self):
+        """
+        Approximate memory cost: the on-disk size as a proxy for the lines
+        (unless they report their own) plus the derived structures built so far
+        """
+        return getattr(self.lines, 'nbytes', self.version[1]) + self.derived_bytes
+
+
+class PresetCorpus(PresetFileEntry):
+    """
+    Preset files selected together by a folder or glob input, as one list
+    
+    lines is a CorpusLines view over the members' own lines, so nothing is
+    copied. The members stay separate entries of the file cache and are
+    filtered one by one (cached per member version), so when one file
+    changes only that file is parsed and filtered again.
+    version is ((path, version), ...) of the members.
+    """
+    
+    def __init__(self, name, entries):
+        version = tuple((str(entry.path), entry.version) for entry in entries)
+        super().__init__(name, version, CorpusLines([entry.lines for entry in entries]))
+        self.entries = entries
+    
+    def source(self, index):
+        """Member entry that line index comes from"""
+        return self.entries[self.lines.locate(index)[0]]
+    
+    def text_contains(self, substring):
+        return any(entry.text_contains(substring) for entry in self.entries)
+    
+    @property
+    def wildcard_references(self):
+        return frozenset().union(*(entry.wildcard_references for entry in self.entries))
+    
+    def merge_indices(self, parts, fuzzy_keywords=None):
+        """
+        Shift the members' filter results (one list of line numbers per member)
+        into corpus line numbers; with fuzzy_keywords they are ranked by score
+        across all members, as PresetSearchIndex.find_fuzzy ranks one file
+        """
+        merged = array('I')
+        for offset, part in zip(self.lines.offsets, parts):
+            merged.extend(i + offset for i in part)
+        if fuzzy_keywords:
+            grams = keyword_trigrams(fuzzy_keywords)
+            lines = self.lines
+            scores = {i: len(line_trigrams(lines[i].lower()) & grams) for i in merged}
+            merged = array('I', sorted(merged, key=lambda i: (-scores[i], i)))
+        return merged
+    
+    @property
+    def nbytes(self):
+        return sum(entry.nbytes for entry in self.entries)
+
+
+class PresetFileCache:
+    """
+    Process-wide LRU cache of parsed preset files
+    
+    Entries are keyed on the resolved file path and validated against the
+    file's (mtime_ns, size), so an unchanged file is parsed only once.
+    Least recently used entries are evicted when either the entry count
+    or the total byte budget is exceeded.
+    
+    Safe to use from several threads: the bookkeeping is guarded by one
+    lock, while files are parsed outside it, so different files load in
+    parallel and concurrent requests for the same file parse it only once.
+    """
+    
+    def __init__(self, max_entries=PRESET_CACHE_MAX_FILES, max_bytes=PRESET_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks = {}
+    
+    @staticmethod
+    def file_version(file_path):
+        """Return (mtime_ns, size) for a file"""
+        st = os.stat(file_path)
+        return (st.st_mtime_ns, st.st_size)
+    
+    def get(self, file_path, loader, prepare=None):
+        """
+        Return the PresetFileEntry for file_path, calling loader(file_path, version)
+        to parse it only when the file is not cached or has changed on disk
+        
+        loader must parse only the first version[1] bytes, so data appended
+        after the stat is picked up by the next append_from instead of twice.
+        It returns the preset lines, or (lines, yaml_data) for YAML files
+        so the parsed structure is kept with them
+        prepare(entry, old_entry) is called on a newly parsed entry before it
+        replaces the old one (old_entry is None if the file was not cached)
+        """
+        key = str(file_path)
+        version = self.file_version(file_path)
+        
+        entry = self._lookup(key, version)
+        if entry is not None:
+            return entry
+        
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        try:
+            with load_lock:
+                # Another thread may have loaded this version while we waited
+                entry = self._lookup(key, version)
+                if entry is None:
+                    entry = self._load(key, file_path, version, loader, prepare)
+        finally:
+            with self._lock:
+                self._load_locks.pop(key, None)
+        return entry
+    
+    def _lookup(self, key, version):
+        """Cached entry for key if it is still at version, else None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+    
+    def _load(self, key, file_path, version, loader, prepare):
+        with self._lock:
+            old = self._entries.get(key)
+        
+        # Files that were only appended to are extended instead of re-parsed
+        if old is not None:
+            appended = old.append_from(file_path, version)
+            if appended is not None:
+                if prepare is not None:
+                    prepare(appended, old)
+                self._store(key, appended)
+                return appended
+        
+        lines = loader(file_path, version)
+        yaml_data = None
+        if isinstance(lines, tuple):
+            lines, yaml_data = lines
+        # Digest of the bytes the loader parsed (taken before lines may be compacted)
+        content_digest = getattr(lines, 'content_digest', None)
+        if isinstance(lines, list) and len(lines) >= COMPACT_MIN_LINES:
+            lines = CompactLines.from_lines(lines)
+        
+        entry = PresetFileEntry(file_path, version, lines)
+        if yaml_data is not None:
+            entry.yaml_data = yaml_data
+            entry.charge(deep_sizeof(yaml_data))
+        if key.lower().endswith('.txt'):
+            entry.content_digest = content_digest or self.file_digest(file_path, version[1])
+        if prepare is not None:
+            prepare(entry, old)
+        self._store(key, entry)
+        return entry
+    
+    @staticmethod
+    def file_digest(file_path, size):
+        """sha1 hex digest of the first size bytes of a file, or None if unreadable"""
+        try:
+            with open(file_path, 'rb') as f:
+                hasher, _ = hash_file_prefix(f, size)
+            return hasher.hexdigest() if hasher else None
+        except OSError:
+            return None
+    
+    def _store(self, key, entry):
+        with self._lock:
+            self._store_locked(key, entry)
+    
+    def _store_locked(self, key, entry):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._total_bytes -= old.nbytes
+        
+        # Later charges go through the lock even if the entry is not kept
+        entry.cache = self
+        # Files larger than the whole budget are parsed but never cached
+        if entry.nbytes > self.max_bytes:
+            return
+        
+        self._entries[key] = entry
+        self._total_bytes += entry.nbytes
+        self._evict_locked()
+    
+    def _evict_locked(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._total_bytes -= evicted.nbytes
+    
+    def charge(self, entry, nbytes):
+        """
+        Add nbytes of derived structures to entry's cost; while entry is
+        cached this counts against the budget, evicting as needed
+        """
+        with self._lock:
+            entry.derived_bytes += nbytes
+            if self._entries.get(str(entry.path)) is entry:
+                self._total_bytes += nbytes
+                self._evict_locked()
+    
+    def peek(self, file_path):
+        """Cached entry of file_path (of any version) without touching its recency, or None"""
+        with self._lock:
+            return self._entries.get(str(file_path))
+    
+    def invalidate(self, file_path=None):
+        """Drop one file from the cache, or everything if file_path is None"""
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+                self._total_bytes = 0
+                return
+            old = self._entries.pop(str(file_path), None)
+            if old is not None:
+                self._total_bytes -= old.nbytes
+
+
+# Shared by all node instances in this process
+_preset_file_cache = PresetFileCache()
+
+# (file path, file version, include, exclude, mode) -> array of matching line numbers
+_filter_result_cache = LRUCache(FILTER_CACHE_MAX_QUERIES)
+
+# folder/glob input -> PresetCorpus of its current member entries
+_corpus_cache = LRUCache(CORPUS_CACHE_MAX)
+
+# Quoted phrases or individual words, with optional minus prefix
+_KEYWORD_PATTERN = re.compile(r'(-?)"([^"]+)"|(-?)([^,\s]+)')
+
+
+PRESET_DIR = Path(__file__).parent / "presets"
+WILDCARD_DIR = Path(__file__).parent / "../ComfyUI-Impact-Pack/wildcards"
+PRESET_EXTENSIONS = ('.txt', '.yaml', '.yml')
+
+_resolved_wildcard_dir = None
+
+
+def get_wildcard_dir():
+    """
+    Get the Impact Pack wildcard directory, or None if it does not exist
+    The path is resolved once; only its existence is re-checked
+    """
+    global _resolved_wildcard_dir
+    try:
+        if _resolved_wildcard_dir is None:
+            _resolved_wildcard_dir = WILDCARD_DIR.resolve()
+        if _resolved_wildcard_dir.exists():
+            return _resolved_wildcard_dir
+        return None
+    except Exception:
+        return None
+
+
+class PresetDirectoryIndex:
+    """
+    Cached name -> path map of the preset files in a directory tree
+    
+    Names are paths relative to the directory with "/" separators
+    ("example.txt", "styles/light/soft.yaml"). Every directory is rescanned
+    only when its own mtime changes (adding, removing or renaming a file or
+    subdirectory updates it), so a large tree is refreshed incrementally.
+    The mtimes are checked at most once per _RECHECK_NS. Symlinked
+    directories are followed, but each real directory is listed only once,
+    so a symlink loop ends instead of recursing until ELOOP.
+    With max_depth, only files at most that many folders below directory are indexed.
+    """
+    
+    # A directory modified this recently may change again within the same mtime tick
+    _SETTLE_NS = 2 * 10 ** 9
+    # Minimum time between two checks of the tree
+    _RECHECK_NS = 10 ** 9
+    
+    def __init__(self, directory, max_depth=None):
+        self.directory = directory
+        self.max_depth = max_depth
+        # relative directory ("" for the root) -> (mtime_ns or None, file names, subdirectory names)
+        self._dirs = {}
+        self._paths = {}
+        self._names = frozenset()
+        self._checked_ns = None
+        self._glob_cache = {}
+        self._lock = threading.Lock()
+    
+    def _refresh(self):
+        now = time.time_ns()
+        if self._checked_ns is not None and now - self._checked_ns < self._RECHECK_NS:
+            return
+        self._checked_ns = now
+        
+        changed = False
+        seen = set()
+        visited = set()
+        pending = [""]
+        while pending:
+            relative = pending.pop()
+            path = os.path.join(self.directory, relative) if relative else self.directory
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            # (st_dev, st_ino) identifies the real directory behind any symlinks
+            identity = (st.st_dev, st.st_ino)
+            if identity in visited:
+                continue
+            visited.add(identity)
+            seen.add(relative)
+            mtime_ns = st.st_mtime_ns
+            
+            cached = self._dirs.get(relative)
+            if cached is None or cached[0] != mtime_ns:
+                try:
+                    files, subdirs = self._scan(path)
+                except OSError as e:
+                    # Keep what was listed before, if anything
+                    print(f"[Prompt Preset Selector] Warning: Could not list {path}: {e}")
+                    if cached is None:
+                        seen.discard(relative)
+                        continue
+                else:
+                    changed = True
+                    self._update_paths(relative, cached[1] if cached else (), files)
+                    # Rescan next time if the mtime is too fresh to be trusted
+                    cached = (mtime_ns if now - mtime_ns > self._SETTLE_NS else None, files, subdirs)
+                    self._dirs[relative] = cached
+            if self.max_depth is None or relative.count('/') < self.max_depth:
+                pending.extend(f"{relative}{subdir}/" for subdir in cached[2])
+        
+        for relative in [relative for relative in self._dirs if relative not in seen]:
+            changed = True
+            self._update_paths(relative, self._dirs.pop(relative)[1], ())
+        
+        if changed:
+            self._names = frozenset(self._paths)
+            self._glob_cache = {}
+    
+    def _scan(self, path):
+        files = []
+        subdirs = []
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir():
+                    subdirs.append(entry.name)
+                elif entry.name.endswith(PRESET_EXTENSIONS) and entry.is_file():
+                    files.append(entry.name)
+        return tuple(files), tuple(subdirs)
+    
+    def _update_paths(self, relative, old_files, new_files):
+        for name in old_files:
+            self._paths.pop(relative + name, None)
+        base = Path(self.directory, relative) if relative else Path(self.directory)
+        for name in new_files:
+            self._paths[relative + name] = base / name
+    
+    def names(self):
+        """Return the set of preset file names (relative paths) in the tree"""
+        with self._lock:
+            self._refresh()
+            return self._names
+    
+    def lookup(self, name):
+        """Return the path of preset file name, or None if it is not in the tree"""
+        with self._lock:
+            self._refresh()
+            return self._paths.get(name)
+    
+    def glob(self, pattern, across_folders=True):
+        """
+        Sorted names matching the fnmatch pattern (cached until the tree changes)
+        Unless across_folders, * and ? stay within one folder and only ** crosses folders
+        """
+        with self._lock:
+            self._refresh()
+            matches = self._glob_cache.get((pattern, across_folders))
+            if matches is None:
+                if across_folders:
+                    matched = (name for name in self._names if fnmatch.fnmatchcase(name, pattern))
+                else:
+                    regex = path_glob_regex(pattern)
+                    matched = (name for name in self._names if regex.match(name))
+                matches = self._glob_cache[(pattern, across_folders)] = sorted(matched)
+            return matches
+
+
+def path_glob_regex(pattern):
+    """
+    Compile a glob over "/"-separated names in which * and ? never match "/",
+    ** matches across folders and "**/" also matches no folder at all
+    """
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        elif pattern[i] == '[' and pattern.find(']', i + 2) != -1:
+            end = pattern.find(']', i + 2)
+            members = pattern[i + 1:end].replace('\\', '\\\\')
+            if members.startswith('!'):
+                members = '^' + members[1:]
+            parts.append(f'[{members}]')
+            i = end + 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile(''.join(parts) + r'\Z', re.DOTALL)
+
+
+class PresetFileWatcher(threading.Thread):
+    """
+    Daemon thread reporting changed preset files in a set of directory trees
+    
+    on_change(path) is called for every .txt/.yaml/.yml file that was
+    written, created or moved in, on_remove(path) for one that was deleted
+    or moved away. Uses inotify when inotify_simple is installed, otherwise
+    compares the files' (mtime_ns, size) every interval seconds.
+    """
+    
+    _INOTIFY_MASK = 0
+    if INOTIFY_AVAILABLE:
+        _INOTIFY_MASK = (
+            inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO | inotify_flags.MOVED_FROM
+            | inotify_flags.DELETE | inotify_flags.CREATE
+        )
+    
+    def __init__(self, directories, on_change, on_remove, interval=WATCH_INTERVAL_SECONDS):
+        super().__init__(name="PromptPresetWatcher", daemon=True)
+        self.directories = [Path(directory) for directory in directories]
+        self.on_change = on_change
+        self.on_remove = on_remove
+        self.interval = interval
+        self._stop_event = threading.Event()
+    
+    def stop(self):
+        self._stop_event.set()
+    
+    def run(self):
+        if INOTIFY_AVAILABLE:
+            try:
+                self._watch_inotify()
+                return
+            except OSError as e:
+                print(f"[Prompt Preset Selector] Warning: inotify unavailable ({e}), polling instead")
+        self._watch_polling()
+    
+    def _dispatch(self, paths):
+        for path in paths:
+            try:
+                if path.is_file():
+                    self.on_change(path)
+                else:
+                    self.on_remove(path)
+            except Exception as e:
+                print(f"[Prompt Preset Selector] Warning: Could not refresh {path}: {e}")
+    
+    @staticmethod
+    def _walk(directory):
+        """directory and all its subdirectories (hidden ones skipped)"""
+        for root, subdirs, _ in os.walk(directory):
+            subdirs[:] = [subdir for subdir in subdirs if not subdir.startswith('.')]
+            yield Path(root)
+    
+    def _watch_inotify(self):
+        inotify = INotify()
+        watches = {}
+        
+        def add_tree(directory):
+            # inotify is not recursive: every subdirectory needs its own watch
+            for subdir in self._walk(directory):
+                try:
+                    watches[inotify.add_watch(str(subdir), self._INOTIFY_MASK)] = subdir
+                except OSError:
+                    pass
+        
+        try:
+            for directory in self.directories:
+                add_tree(directory)
+            while not self._stop_event.is_set():
+                # read_delay gathers the burst of events an editor's save produces
+                events = inotify.read(timeout=int(self.interval * 1000), read_delay=100)
+                changed = set()
+                for event in events:
+                    if event.wd not in watches:
+                        continue
+                    path = watches[event.wd] / event.name
+                    if event.mask & inotify_flags.ISDIR:
+                        if event.mask & (inotify_flags.CREATE | inotify_flags.MOVED_TO) and not event.name.startswith('.'):
+                            add_tree(path)
+                    elif event.name.endswith(PRESET_EXTENSIONS) and not event.mask & inotify_flags.CREATE:
+                        changed.add(path)
+                self._dispatch(changed)
+        finally:
+            inotify.close()
+    
+    def _snapshot(self):
+        versions = {}
+        for directory in self.directories:
+            for subdir in self._walk(directory):
+                try:
+                    with os.scandir(subdir) as it:
+                        for entry in it:
+                            if entry.name.endswith(PRESET_EXTENSIONS) and entry.is_file():
+                                st = entry.stat()
+                                versions[Path(entry.path)] = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    pass
+        return versions
+    
+    def _watch_polling(self):
+        versions = self._snapshot()
+        while not self._stop_event.wait(self.interval):
+            current = self._snapshot()
+            changed = [path for path, version in current.items() if versions.get(path) != version]
+            removed = [path for path in versions if path not in current]
+            versions = current
+            self._dispatch(changed + removed)
+
+
+# Indexes of the presets and wildcards folders; folders from absolute_path inputs are kept in an LRU
+_directory_indexes = {}
+_absolute_directory_indexes = LRUCache(DIRECTORY_INDEX_CACHE_MAX)
+_preset_file_listing = (None, [])
+
+
+def _get_directory_index(directory):
+    key = str(directory)
+    index = _directory_indexes.get(key)
+    if index is None:
+        # setdefault keeps one index per directory if two threads get here at once
+        index = _directory_indexes.setdefault(key, PresetDirectoryIndex(directory))
+    return index
+
+
+def _get_absolute_directory_index(directory, max_depth):
+    """Index of a folder entered in absolute_path, walking at most max_depth folders down (None: all)"""
+    key = (str(directory), max_depth)
+    index = _absolute_directory_indexes.get(key)
+    if index is None:
+        index = PresetDirectoryIndex(directory, max_depth)
+        _absolute_directory_indexes.put(key, index)
+    return index
+
+
+def list_preset_files():
+    """
+    Get sorted list of preset file names from both presets and wildcards directories
+    Files in both directories are listed once
+    """
+    global _preset_file_listing
+    try:
+        names = _get_directory_index(PRESET_DIR).names()
+        
+        wildcard_dir = get_wildcard_dir()
+        if wildcard_dir:
+            wildcard_names = _get_directory_index(wildcard_dir).names()
+        else:
+            wildcard_names = frozenset()
+        
+        # Re-sort only when one of the directory listings changed
+        listing_key = (names, wildcard_names)
+        listing = _preset_file_listing
+        if listing[0] != listing_key:
+            listing = _preset_file_listing = (listing_key, sorted(names | wildcard_names))
+        return list(listing[1])
+    except Exception as e:
+        print(f"[Prompt Preset Selector] Error reading preset directories: {e}")
+        return []
+
+
+def resolve_preset_path(name):
+    """
+    Find a preset file by name: presets directory first, then wildcards directory
+    Returns a Path, or None if it is in neither
+    """
+    path = _get_directory_index(PRESET_DIR).lookup(name)
+    if path is None:
+        wildcard_dir = get_wildcard_dir()
+        if wildcard_dir:
+            path = _get_directory_index(wildcard_dir).lookup(name)
+    return path
+
+
+def _preset_directory_indexes():
+    """Indexes of the presets directory and, if present, the wildcards directory (lookup order)"""
+    indexes = [_get_directory_index(PRESET_DIR)]
+    wildcard_dir = get_wildcard_dir()
+    if wildcard_dir:
+        indexes.append(_get_directory_index(wildcard_dir))
+    return indexes
+
+
+def is_wildcard_glob(name):
+    """True if a __name__ wildcard is a glob pattern such as styles/*"""
+    return '*' in name or '?' in name
+
+
+def resolve_wildcard_path(name):
+    """
+    Find the file of a __name__ wildcard; name may contain "/" for subdirectories
+    (e.g. styles/light). .txt is preferred over .yaml/.yml, then presets over wildcards
+    """
+    for extension in PRESET_EXTENSIONS:
+        path = resolve_preset_path(name + extension)
+        if path is not None:
+            return path
+    return None
+
+
+def match_wildcard_paths(pattern):
+    """
+    (name, path) of every wildcard file whose name matches a glob pattern, sorted by name
+    Matched against the directory indexes, so no filesystem probing is needed;
+    a name found several times counts once, with the path resolve_wildcard_path picks
+    """
+    names = set()
+    for index in _preset_directory_indexes():
+        for extension in PRESET_EXTENSIONS:
+            names.update(name[:-len(extension)] for name in index.glob(pattern + extension))
+    return [(name, resolve_wildcard_path(name)) for name in sorted(names)]
+
+
+def list_preset_choices():
+    """
+    preset_file dropdown entries: the preset files plus every folder holding
+    some of them ("styles/"), which selects all files below it at once
+    """
+    names = list_preset_files()
+    folders = set()
+    for name in names:
+        parts = name.split('/')[:-1]
+        for depth in range(1, len(parts) + 1):
+            folders.add("/".join(parts[:depth]) + "/")
+    return sorted(names + list(folders))
+
+
+def is_preset_corpus(name):
+    """True if a preset_file/absolute_path input names a folder or glob instead of one file"""
+    return name.endswith(('/', os.sep)) or is_wildcard_glob(name) or (os.path.isabs(name) and os.path.isdir(name))
+
+
+def resolve_corpus_paths(name):
+    """
+    Paths of the preset files a folder or glob input selects, sorted by name
+    
+    Absolute inputs are matched against an index of their folder (the part
+    before the first glob character) that only goes as deep as the pattern
+    does: * stays within one folder and ** crosses folders, while a plain
+    folder selects its whole tree. Relative ones, like the dropdown's
+    "styles/", are matched against the presets and wildcards folders, where
+    * also matches across subfolders as with __dir/*__ wildcards.
+    """
+    pattern = name.replace(os.sep, '/')
+    
+    if os.path.isabs(name):
+        if not is_wildcard_glob(pattern):
+            pattern = pattern.rstrip('/') + '/**'
+        parts = pattern.split('/')
+        depth = next(i for i, part in enumerate(parts) if is_wildcard_glob(part))
+        relative = "/".join(parts[depth:])
+        max_depth = None if '**' in relative else relative.count('/')
+        index = _get_absolute_directory_index(os.path.normpath("/".join(parts[:depth]) or "/"), max_depth)
+        return [index.lookup(match) for match in index.glob(relative, across_folders=False)]
+    
+    if pattern.endswith('/'):
+        pattern += '*'
+    names = set()
+    for index in _preset_directory_indexes():
+        names.update(index.glob(pattern))
+    return [resolve_preset_path(match) for match in sorted(names)]
+
+
+def resolve_input_file(preset_file, absolute_path):
+    """Path of the file selected by a node's preset_file/absolute_path inputs, or None"""
+    if absolute_path and absolute_path.strip():
+        return Path(absolute_path.strip())
+    
+    # Need to find the actual file location (presets or wildcards)
+    if preset_file != "(No preset files found)":
+        return resolve_preset_path(preset_file)
+    return None
+
+
+def resolve_input_files(preset_file, absolute_path):
+    """Paths of all files a node's inputs select: the members of a folder or glob, or the one file"""
+    name = absolute_path.strip() if absolute_path and absolute_path.strip() else preset_file
+    if is_preset_corpus(name):
+        return resolve_corpus_paths(name)
+    file_path = resolve_input_file(preset_file, absolute_path)
+    return [file_path] if file_path is not None else []
+
+
+def file_fingerprint(file_path):
+    """(mtime_ns, size) of a file from one stat call (nothing is read), or None if missing"""
+    if file_path is None:
+        return None
+    try:
+        return PresetFileCache.file_version(file_path)
+    except OSError:
+        return None
+
+
+def input_fingerprint(preset_file, absolute_path):
+    """
+    file_fingerprint of the selected file, or for a folder or glob a digest
+    of the names and fingerprints of all its files (None if nothing matches)
+    """
+    name = absolute_path.strip() if absolute_path and absolute_path.strip() else preset_file
+    if not is_preset_corpus(name):
+        return file_fingerprint(resolve_input_file(preset_file, absolute_path))
+    stats = [(str(path), file_fingerprint(path)) for path in resolve_corpus_paths(name)]
+    if not stats:
+        return None
+    return hashlib.sha1(repr(stats).encode('utf-8')).hexdigest()
+
+
+def _seed_key(seed, position):
+    return "\0".join(str(part) for part in (seed,) + position).encode('utf-8')
+
+
+def seeded_index(count, seed, *position):
+    """
+    Counter-based random index in range(count) for seed and position
+    The same inputs always give the same index, independent of any other
+    draws, so it is reproducible and safe to call from any thread
+    """
+    value = int.from_bytes(hashlib.blake2b(_seed_key(seed, position), digest_size=8).digest(), 'little')
+    return value % count
+
+
+class AliasTable:
+    """
+    Walker alias table: draws index i with probability weights[i] / sum(weights)
+    Built once in O(n) (Vose's method); every draw is O(1), one column
+    plus one biased coin flip, however many entries there are
+    """
+    
+    __slots__ = ('probability', 'alias')
+    
+    def __init__(self, weights):
+        count = len(weights)
+        total = sum(weights)
+        if total <= 0:
+            # Every weight is zero: draw uniformly rather than never
+            weights, total = [1.0] * count, float(count)
+        scaled = [weight * count / total for weight in weights]
+        self.probability = array('d', [1.0]) * count
+        self.alias = array('I', range(count))
+        
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            self.probability[low] = scaled[low]
+            self.alias[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+        # Whatever is left over (rounding) keeps probability 1
+    
+    def __len__(self):
+        return len(self.probability)
+    
+    @property
+    def nbytes(self):
+        return sys.getsizeof(self.probability) + sys.getsizeof(self.alias)
+    
+    def pick(self, column, fraction):
+        """Index for a uniformly drawn column and fraction in [0, 1)"""
+        return column if fraction < self.probability[column] else self.alias[column]
+    
+    def sample(self, rng):
+        """Draw an index using the random.Random instance rng"""
+        return self.pick(rng.randrange(len(self)), rng.random())
+    
+    def sample_seeded(self, seed, *position):
+        """Draw an index derived from seed and position only (see seeded_index)"""
+        digest = hashlib.blake2b(_seed_key(seed, position), digest_size=16).digest()
+        column = int.from_bytes(digest[:8], 'little') % len(self)
+        return self.pick(column, int.from_bytes(digest[8:], 'little') / 2 ** 64)
+
+
+class ShufflePermutation:
+    """
+    Seed-determined permutation of range(count), evaluated on demand
+    A 4-round Feistel network over the next even power of two, cycle-walked
+    back into range(count), so no table of count entries is ever built and
+    the same seed gives the same order with or without NumPy
+    """
+    
+    _MULTIPLIER = 0x9E3779B97F4A7C15
+    _MASK64 = (1 << 64) - 1
+    
+    def __init__(self, count, seed):
+        self.count = count
+        self.half_bits = max(1, ((count - 1).bit_length() + 1) // 2)
+        self.half_mask = (1 << self.half_bits) - 1
+        digest = hashlib.blake2b(f"shuffle\0{seed}".encode('utf-8'), digest_size=32).digest()
+        self.keys = struct.unpack('<4Q', digest)
+    
+    def __len__(self):
+        return self.count
+    
+    def _encrypt(self, value):
+        shift = 64 - self.half_bits
+        left, right = value >> self.half_bits, value & self.half_mask
+        for key in self.keys:
+            left, right = right, left ^ ((((right ^ key) * self._MULTIPLIER) & self._MASK64) >> shift)
+        return (left << self.half_bits) | right
+    
+    def __getitem__(self, position):
+        value = self._encrypt(position % self.count)
+        while value >= self.count:
+            value = self._encrypt(value)
+        return value
+    
+    def window(self, start, length):
+        """Indices at positions start .. start + length - 1 (wrapping around), as a list"""
+        if not NUMPY_AVAILABLE or length < 2:
+            return [self[position] for position in range(start, start + length)]
+        
+        half_bits = numpy.uint64(self.half_bits)
+        half_mask = numpy.uint64(self.half_mask)
+        shift = numpy.uint64(64 - self.half_bits)
+        multiplier = numpy.uint64(self._MULTIPLIER)
+        keys = [numpy.uint64(key) for key in self.keys]
+        
+        def encrypt(values):
+            # uint64 multiplication wraps modulo 2**64, matching the masked integer version
+            left, right = values >> half_bits, values & half_mask
+            for key in keys:
+                left, right = right, left ^ (((right ^ key) * multiplier) >> shift)
+            return (left << half_bits) | right
+        
+        positions = (numpy.arange(length, dtype=numpy.uint64) + numpy.uint64(start % self.count)) % numpy.uint64(self.count)
+        values = encrypt(positions)
+        pending = numpy.flatnonzero(values >= self.count)
+        while pending.size:
+            values[pending] = encrypt(values[pending])
+            pending = pending[values[pending] >= self.count]
+        return values.tolist()
+
+
+class WildcardTemplate:
+    """
+    Wildcard text compiled once into a tree of nodes
+    
+    Nodes are plain strings (literal text) or tuples:
+      ('choice', options, n)  {A|B|C}; options are node lists, n numbers the choice in this template
+      ('file', name)          __name__, __dir/name__ or a glob like __dir/*__
+      ('yaml', keys, options) {__key__|__key__}; options are used if the keys have no YAML content
+      ['group', nodes, strip] {text} without alternatives; strip drops its braces
+    
+    Unbalanced braces and stray | or } are literal text. As in the original
+    expander, which resolved the innermost group first while the text still
+    contained a |, a group loses its braces if a choice closes after it or
+    the text has a literal |. Groups are lists so strip can be set once the
+    whole text has been parsed.
+    """
+    
+    _SPECIAL = re.compile(r'[{}|]')
+    _BRACES = re.compile(r'[{}]')
+    _FILE_PATTERN = re.compile(r'__([a-zA-Z0-9_*?-]+(?:/[a-zA-Z0-9_*?-]+)*)__')
+    _YAML_KEYS_PATTERN = re.compile(r'__[^}]+__(?:\|__[^}]+__)*')
+    _YAML_KEY_PATTERN = re.compile(r'__(.+?)__')
+    
+    def __init__(self, text):
+        self.text = text
+        self._choice_count = 0
+        self.nodes = self._parse_top(text)
+        self.has_wildcards = any(not isinstance(node, str) for node in self.nodes)
+    
+    def _add_literal(self, nodes, text):
+        """Append literal text, splitting out __name__ file references"""
+        pos = 0
+        for match in self._FILE_PATTERN.finditer(text):
+            if match.start() > pos:
+                nodes.append(text[pos:match.start()])
+            nodes.append(('file', match.group(1)))
+            pos = match.end()
+        if pos < len(text):
+            nodes.append(text[pos:])
+    
+    def _closed_braces(self, text):
+        """Positions of the { that have a matching } (one pass with a stack)"""
+        closed = set()
+        opened = []
+        for match in self._BRACES.finditer(text):
+            if match.group() == '{':
+                opened.append(match.start())
+            elif opened:
+                closed.add(opened.pop())
+        return closed
+    
+    def _parse_top(self, text):
+        """
+        Parse text in one left-to-right scan, keeping the open groups on an
+        explicit stack (no recursion, so any nesting depth is fine)
+        A { without a matching } is literal text; since it can never be inside
+        a closed group, | and } outside every group are literal too
+        """
+        closed = self._closed_braces(text)
+        nodes = []
+        groups = []  # (content start, options) of the groups being parsed
+        plain_groups = []  # (group node, choices closed before it)
+        literal_bar = False
+        literal_start = 0
+        for match in self._SPECIAL.finditer(text):
+            i = match.start()
+            char = match.group()
+            if not groups:
+                literal_bar = literal_bar or char == '|'
+                if char != '{' or i not in closed:
+                    continue
+                self._add_literal(nodes, text[literal_start:i])
+                groups.append((i + 1, [[]]))
+            else:
+                options = groups[-1][1]
+                self._add_literal(options[-1], text[literal_start:i])
+                if char == '{':
+                    groups.append((i + 1, [[]]))
+                elif char == '|':
+                    options.append([])
+                else:
+                    start, options = groups.pop()
+                    node = self._make_group_node(text, start, i, options)
+                    if node[0] == 'group' and start < i:
+                        plain_groups.append((node, self._choice_count))
+                    (groups[-1][1][-1] if groups else nodes).append(node)
+            literal_start = i + 1
+        self._add_literal(nodes, text[literal_start:])
+        
+        for node, choices_before in plain_groups:
+            node[2] = literal_bar or choices_before < self._choice_count
+        return nodes
+    
+    def _make_group_node(self, text, start, end, options):
+        """Node for the group whose content is text[start:end]"""
+        if self._YAML_KEYS_PATTERN.fullmatch(text, start, end):
+            keys = tuple(self._YAML_KEY_PATTERN.findall(text, start, end))
+            return ('yaml', keys, [self._strip_option(option) for option in options])
+        
+        if len(options) == 1:
+            return ['group', options[0], False]
+        
+        self._choice_count += 1
+        return ('choice', [self._strip_option(option) for option in options], self._choice_count)
+    
+    @staticmethod
+    def _strip_option(nodes):
+        """Strip surrounding whitespace from a choice option"""
+        nodes = list(nodes)
+        while nodes and isinstance(nodes[0], str):
+            nodes[0] = nodes[0].lstrip()
+            if nodes[0]:
+                break
+            nodes.pop(0)
+        while nodes and isinstance(nodes[-1], str):
+            nodes[-1] = nodes[-1].rstrip()
+            if nodes[-1]:
+                break
+            nodes.pop()
+        return nodes
+
+
+_template_cache = LRUCache(TEMPLATE_CACHE_MAX)
+
+
+_glob_alias_tables = LRUCache(FILTER_CACHE_MAX_QUERIES)
+
+# (path, (mtime_ns, size)) -> __name__ references of that file version (see wildcard_reference_names)
+_wildcard_reference_cache = LRUCache(WILDCARD_REFERENCE_CACHE_MAX)
+
+
+def glob_alias_table(pattern, entries):
+    """
+    AliasTable over the lines of entries (the files a glob matched) in order,
+    or None when none of them is weighted; cached per pattern and file versions
+    """
+    key = (pattern, tuple((str(entry.path), entry.version) for entry in entries))
+    table = _glob_alias_tables.get(key)
+    if table is None:
+        table = False
+        if any(entry.has_weight_markers for entry in entries):
+            weights = array('d', (split_weight(line)[0] for entry in entries for line in entry.lines))
+            if any(weight != 1.0 for weight in weights):
+                table = AliasTable(weights)
+        _glob_alias_tables.put(key, table)
+    return table or None
+
+
+def compile_wildcard_template(text):
+    """Return the cached WildcardTemplate for text, compiling it on first use"""
+    template = _template_cache.get(text)
+    if template is None:
+        template = WildcardTemplate(text)
+        _template_cache.put(text, template)
+    return template
+
+
+class MemoryCursorStore:
+    """
+    Bounded in-memory store for selection cursors
+    
+    Values are keyed on (kind, key): kind is "continue", "shuffle" or
+    "wildcard" and key the node's state key. The least recently used
+    cursors are dropped once max_keys is exceeded.
+    """
+    
+    def __init__(self, max_keys=CURSOR_STORE_MAX_KEYS):
+        self.max_keys = max_keys
+        self._cursors = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, kind, key, default=None):
+        with self._lock:
+            try:
+                self._cursors.move_to_end((kind, key))
+            except KeyError:
+                return default
+            return self._cursors[(kind, key)]
+    
+    def set(self, kind, key, value):
+        with self._lock:
+            self._set(kind, key, value)
+            self._changed(kind, key, value)
+    
+    def update(self, kind, key, function):
+        """
+        Atomically replace a cursor: function(current value or None) returns
+        (new value, result) and update returns result, so concurrent runs
+        never read the same cursor
+        """
+        with self._lock:
+            value, result = function(self._cursors.get((kind, key)))
+            self._set(kind, key, value)
+            self._changed(kind, key, value)
+        return result
+    
+    def _changed(self, kind, key, value):
+        """Called with the lock held after a cursor was set (for persistent stores)"""
+    
+    def _set(self, kind, key, value):
+        self._cursors[(kind, key)] = value
+        self._cursors.move_to_end((kind, key))
+        while len(self._cursors) > self.max_keys:
+            self._cursors.popitem(last=False)
+    
+    def items(self, kind=None, key_prefix=""):
+        """List of (kind, key, value), least recently used first"""
+        with self._lock:
+            return [
+                (k, key, value) for (k, key), value in self._cursors.items()
+                if (kind is None or k == kind) and key.startswith(key_prefix)
+            ]
+    
+    def reset(self, kind=None, key_prefix=""):
+        """Forget the matching cursors; returns how many were removed"""
+        with self._lock:
+            return self._reset(kind, key_prefix)
+    
+    def _reset(self, kind, key_prefix):
+        matches = [
+            (k, key) for k, key in self._cursors
+            if (kind is None or k == kind) and key.startswith(key_prefix)
+        ]
+        for match in matches:
+            del self._cursors[match]
+        return len(matches)
+    
+    def flush(self):
+        """Write pending changes to persistent storage (nothing to do in memory)"""
+    
+    def __len__(self):
+        return len(self._cursors)
+
+
+class SQLiteCursorStore(MemoryCursorStore):
+    """
+    Cursor store backed by a SQLite file, so sweeps continue after a restart
+    
+    Reads are served from memory. Changes are written behind: they are
+    collected and saved in one transaction flush_seconds after the first
+    change (and at exit), so an execution never waits for the disk.
+    """
+    
+    def __init__(self, path=CURSOR_DB_PATH, max_keys=CURSOR_STORE_MAX_KEYS, flush_seconds=CURSOR_FLUSH_SECONDS):
+        super().__init__(max_keys)
+        self.path = Path(path)
+        self.flush_seconds = flush_seconds
+        self._dirty = {}
+        self._resets = []
+        self._timer = None
+        self._flush_lock = threading.Lock()
+        self._load()
+        atexit.register(self.flush)
+    
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS cursors ("
+            "kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, updated REAL NOT NULL, "
+            "PRIMARY KEY (kind, key))"
+        )
+        return connection
+    
+    def _load(self):
+        try:
+            connection = self._connect()
+            try:
+                rows = connection.execute(
+                    "SELECT kind, key, value FROM cursors ORDER BY updated DESC LIMIT ?", (self.max_keys,)
+                ).fetchall()
+            finally:
+                connection.close()
+        except (OSError, sqlite3.Error) as e:
+            print(f"[Prompt Preset Selector] Warning: Could not load cursors from {self.path}: {e}")
+            return
+        
+        # Oldest first, so the most recently updated cursors are the last to be evicted
+        for kind, key, value in reversed(rows):
+            try:
+                self._set(kind, key, json.loads(value))
+            except ValueError:
+                pass
+    
+    def _changed(self, kind, key, value):
+        self._dirty[(kind, key)] = value
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_seconds, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def reset(self, kind=None, key_prefix=""):
+        with self._lock:
+            removed = self._reset(kind, key_prefix)
+            # Pending writes for these cursors are dropped; the rows are deleted on flush
+            for dirty_kind, dirty_key in list(self._dirty):
+                if (kind is None or dirty_kind == kind) and dirty_key.startswith(key_prefix):
+                    del self._dirty[(dirty_kind, dirty_key)]
+            self._resets.append((kind, key_prefix))
+        self.flush()
+        return removed
+    
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, {}
+                resets, self._resets = self._resets, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not dirty and not resets:
+                return
+            
+            now = time.time()
+            try:
+                connection = self._connect()
+                try:
+                    with connection:
+                        for kind, key_prefix in resets:
+                            connection.execute(
+                                "DELETE FROM cursors WHERE (?1 IS NULL OR kind = ?1) AND substr(key, 1, ?2) = ?3",
+                                (kind, len(key_prefix), key_prefix)
+                            )
+                        connection.executemany(
+                            "INSERT OR REPLACE INTO cursors (kind, key, value, updated) VALUES (?, ?, ?, ?)",
+                            [(kind, key, json.dumps(value), now) for (kind, key), value in dirty.items()]
+                        )
+                        # Keep the file as bounded as the in-memory view
+                        connection.execute(
+                            "DELETE FROM cursors WHERE rowid NOT IN "
+                            "(SELECT rowid FROM cursors ORDER BY updated DESC LIMIT ?)", (self.max_keys,)
+                        )
+                finally:
+                    connection.close()
+            except (OSError, sqlite3.Error) as e:
+                print(f"[Prompt Preset Selector] Warning: Could not save cursors to {self.path}: {e}")
+
+
+def open_cursor_store():
+    """Create the cursor store selected by CURSOR_STORE"""
+    if CURSOR_STORE == "sqlite":
+        return SQLiteCursorStore()
+    if CURSOR_STORE != "memory":
+        print(f"[Prompt Preset Selector] Warning: Unknown cursor store '{CURSOR_STORE}', using memory")
+    return MemoryCursorStore()
+
+
+# Process-wide cursor store shared by all selector nodes
+_cursor_store = open_cursor_store()
+
+
+def list_cursors(kind=None, key_prefix=""):
+    """Current cursors as (kind, key, value), least recently used first"""
+    return _cursor_store.items(kind, key_prefix)
+
+
+def reset_cursors(kind=None, key_prefix=""):
+    """Forget cursors so their sweeps start over; returns how many were removed"""
+    return _cursor_store.reset(kind, key_prefix)
 
 
 class PromptPresetSelector:
@@ -25,17 +2135,17 @@ class PromptPresetSelector:
     Enhanced preset selector with keyword filtering and multiple selection modes
     """
     
-    # Class variable to store continuation state across executions
-    _continue_state = {}
+    # Continuation state across executions lives in the shared cursor store:
+    # "continue": state key -> next index, "shuffle": state key -> (seed, cursor)
+    _cursor_store = _cursor_store
     
     def __init__(self):
-        self.preset_dir = Path(__file__).parent / "presets"
+        self.preset_dir = PRESET_DIR
         self.preset_dir.mkdir(exist_ok=True)
     
     @classmethod
     def INPUT_TYPES(cls):
-        instance = cls()
-        preset_files = instance.get_preset_files()
+        preset_files = list_preset_choices()
         
         if not preset_files:
             preset_files = ["(No preset files found)"]
@@ -43,12 +2153,17 @@ class PromptPresetSelector:
         return {
             "required": {
                 "preset_file": (preset_files,),
-                "absolute_path": ("STRING", {"default": "", "multiline": False, "placeholder": "Optional: /absolute/path/to/file.txt or .yaml"}),
+                "absolute_path": ("STRING", {"default": "", "multiline": False, "placeholder": "Optional: /absolute/path/to/file.txt or .yaml, a folder or a glob"}),
                 "keyword": ("STRING", {"default": "", "multiline": False}),
-                "keyword_mode": (["OFF", "AND", "OR"], {"default": "OFF"}),
-                "selection_mode": (["Manual", "Sequential", "Sequential (continue)", "Random"], {"default": "Manual"}),
+                "keyword_mode": (KEYWORD_MODES, {"default": "OFF"}),
+                "selection_mode": (["Manual", "Sequential", "Sequential (continue)", "Random", "Shuffle"], {"default": "Manual"}),
                 "preset_index": ("INT", {"default": 0, "min": 0, "max": 9999, "step": 1}),
                 "seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff}),
+            },
+            "optional": {
+                "preset_list_mode": (PRESET_LIST_MODES, {"default": "Full"}),
+                "list_offset": ("INT", {"default": 0, "min": 0, "max": 0xffffffff, "step": 1}),
+                "list_page_size": ("INT", {"default": PRESET_LIST_DEFAULT_PAGE_SIZE, "min": 1, "max": 100000, "step": 1}),
             }
         }
     
@@ -59,52 +2174,65 @@ class PromptPresetSelector:
     OUTPUT_NODE = False
     
     @classmethod
-    def IS_CHANGED(cls, preset_file, absolute_path, keyword, keyword_mode, selection_mode, preset_index, seed):
-        return f"{preset_file}_{absolute_path}_{keyword}_{keyword_mode}_{selection_mode}_{preset_index}_{seed}"
+    def IS_CHANGED(cls, preset_file, absolute_path, keyword, keyword_mode, selection_mode, preset_index, seed,
+                   preset_list_mode="Full", list_offset=0, list_page_size=PRESET_LIST_DEFAULT_PAGE_SIZE):
+        """
+        The inputs plus the selected file's (mtime_ns, size) (of every file for a
+        folder or glob), so editing a file re-runs the node; modes that advance
+        a cursor always re-run
+        """
+        if selection_mode in STATEFUL_SELECTION_MODES:
+            return float("nan")
+        fingerprint = input_fingerprint(preset_file, absolute_path)
+        return f"{preset_file}_{absolute_path}_{keyword}_{keyword_mode}_{selection_mode}_{preset_index}_{seed}_{preset_list_mode}_{list_offset}_{list_page_size}_{fingerprint}"
+    
+    @classmethod
+    def shared_instance(cls):
+        """Instance for classmethods that need the file loaders (e.g. IS_CHANGED)"""
+        instance = cls.__dict__.get("_shared_instance")
+        if instance is None:
+            instance = cls()
+            cls._shared_instance = instance
+        return instance
     
     def get_preset_files(self):
         """Get list of .txt, .yaml, .yml files from both presets and wildcards directories"""
-        try:
-            files = []
-            
-            # 1. Get files from presets directory
-            if self.preset_dir.exists():
-                for pattern in ["*.txt", "*.yaml", "*.yml"]:
-                    preset_files = [f.name for f in self.preset_dir.glob(pattern)]
-                    files.extend(preset_files)
-            
-            # 2. Get files from Impact Pack wildcards directory (if exists)
-            wildcard_dir = self._get_wildcard_dir()
-            if wildcard_dir and wildcard_dir.exists():
-                for pattern in ["*.txt", "*.yaml", "*.yml"]:
-                    wildcard_files = [f.name for f in wildcard_dir.glob(pattern)]
-                    # Add files that don't already exist in presets (avoid duplicates)
-                    for wf in wildcard_files:
-                        if wf not in files:
-                            files.append(wf)
-            
-            return sorted(files) if files else []
-        except Exception as e:
-            print(f"[Prompt Preset Selector] Error reading preset directories: {e}")
-            return []
+        return list_preset_files()
     
     def _get_wildcard_dir(self):
         """Get the wildcard directory path (for Impact Pack compatibility)"""
-        base_dir = Path(__file__).parent
-        wildcard_path = base_dir / "../ComfyUI-Impact-Pack/wildcards"
-        
-        try:
-            wildcard_path = wildcard_path.resolve()
-            if wildcard_path.exists():
-                return wildcard_path
-            else:
-                return None
-        except Exception:
-            return None
+        return get_wildcard_dir()
+    
+    def refresh_preset_entry(self, file_path):
+        """
+        Re-parse file_path if an older version of it is cached, building the
+        indexes the old version had before the new one is swapped in
+        Returns True if a new version was loaded
+        """
+        file_path = Path(file_path).resolve()
+        cached = _preset_file_cache.peek(file_path)
+        if cached is None:
+            return False
+        entry = self.load_preset_entry(file_path, self.prepare_refreshed_entry)
+        return entry is not None and entry is not cached
+    
+    def prepare_refreshed_entry(self, entry, old):
+        """Warm a newly parsed entry before it replaces old (see PresetFileCache.get)"""
+        if old is not None:
+            entry.warm_like(old)
     
     def load_preset_lines(self, preset_file):
         """
         Load lines from preset file, filtering out comments and empty lines
+        Returns sequence of strings: a list, or CompactLines for very large files
+        (see load_preset_entry)
+        """
+        entry = self.load_preset_entry(preset_file)
+        return entry.lines if entry else []
+    
+    def load_preset_entry(self, preset_file, prepare=None):
+        """
+        Load preset file through the shared cache, filtering out comments and empty lines
         Supports .txt, .yaml, .yml files
         
         Searches in:
@@ -112,12 +2240,13 @@ class PromptPresetSelector:
         2. presets directory
         3. wildcards directory (Impact Pack compatibility)
         
-        Returns list of strings
+        Returns PresetFileEntry (or None on failure) whose lines are
         - For .txt files: plain text lines
         - For .yaml files: may include "key1:key2: text" format for nested dicts
         
         Args:
             preset_file: Either a filename (str) or Path object
+            prepare: Passed on to PresetFileCache.get
         """
         try:
             # Handle both relative (from presets dir) and absolute paths
@@ -125,22 +2254,14 @@ class PromptPresetSelector:
                 if os.path.isabs(preset_file):
                     file_path = Path(preset_file)
                 else:
-                    # Try presets directory first
-                    file_path = self.preset_dir / preset_file
-                    
-                    # If not found, try wildcards directory
-                    if not file_path.exists():
-                        wildcard_dir = self._get_wildcard_dir()
-                        if wildcard_dir:
-                            wildcard_path = wildcard_dir / preset_file
-                            if wildcard_path.exists():
-                                file_path = wildcard_path
+                    # Try presets directory first, then wildcards directory
+                    file_path = resolve_preset_path(preset_file) or self.preset_dir / preset_file
             else:
                 file_path = preset_file
             
             if not file_path.exists():
                 print(f"[Prompt Preset Selector] Warning: Preset file not found: {file_path}")
-                return []
+                return None
             
             suffix = file_path.suffix.lower()
             
@@ -148,27 +2269,71 @@ class PromptPresetSelector:
             if suffix in ['.yaml', '.yml']:
                 if not YAML_AVAILABLE:
                     print(f"[Prompt Preset Selector] Error: PyYAML not installed. Cannot load {file_path.name}")
-                    return []
+                    return None
                 
-                return self.load_yaml_presets(file_path)
+                loader = self.load_yaml_document
             
             # Handle TXT files
             elif suffix == '.txt':
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = []
-                    for line in f:
-                        stripped = line.strip()
-                        if stripped and not stripped.startswith('#'):
-                            lines.append(stripped)
-                    return lines
+                loader = self.load_txt_presets
             
             else:
                 print(f"[Prompt Preset Selector] Warning: Unsupported file format: {suffix}")
-                return []
+                return None
+            
+            # Parsed once per file version, shared across all node instances
+            return _preset_file_cache.get(file_path.resolve(), loader, prepare)
                 
         except Exception as e:
             print(f"[Prompt Preset Selector] Error loading preset file {preset_file}: {e}")
-            return []
+            return None
+    
+    def load_preset_corpus(self, name):
+        """
+        Load the files a folder or glob input selects as one PresetCorpus
+        (None if none of them has presets)
+        
+        Members whose (mtime_ns, size) did not change are reused from the last
+        corpus for name without going through the file cache, so a folder with
+        more files than the cache holds is not re-parsed on every run.
+        """
+        previous = _corpus_cache.get(name)
+        members = {str(entry.path): entry for entry in previous.entries} if previous else {}
+        
+        entries = []
+        for path in resolve_corpus_paths(name):
+            entry = members.get(str(path.resolve()))
+            if entry is None or entry.version != file_fingerprint(path):
+                entry = self.load_preset_entry(path)
+            if entry and entry.lines:
+                entries.append(entry)
+        if not entries:
+            return None
+        
+        if previous and len(previous.entries) == len(entries) and all(a is b for a, b in zip(previous.entries, entries)):
+            return previous
+        corpus = PresetCorpus(name, entries)
+        _corpus_cache.put(name, corpus)
+        return corpus
+    
+    def load_txt_presets(self, file_path, version=None):
+        """
+        Load presets from a .txt file, one per line, skipping comments and empty lines
+        With version, only its first version[1] bytes are read; the result is a
+        TxtPresetList carrying the digest of exactly those bytes.
+        Files of MMAP_MIN_BYTES or more are returned as IndexedTxtLines, so only
+        the lines actually used are read
+        """
+        if version is None:
+            version = PresetFileCache.file_version(file_path)
+        if MMAP_MIN_BYTES and version[1] >= MMAP_MIN_BYTES:
+            return IndexedTxtLines.open(file_path, version)
+        
+        with open(file_path, 'rb') as f:
+            content = f.read(version[1])
+        lines = TxtPresetList(parse_txt_presets(content.decode('utf-8')))
+        lines.content_digest = hashlib.sha1(content).hexdigest()
+        return lines
     
     def load_yaml_presets(self, file_path):
         """
@@ -179,32 +2344,94 @@ class PromptPresetSelector:
         
         Returns list of strings (for dict format, includes "key1:key2: text" format)
         """
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-            
-            if data is None:
-                return []
-            
-            # Format A: {'presets': [...]}
-            if isinstance(data, dict) and 'presets' in data:
-                presets = data['presets']
-                if isinstance(presets, list):
-                    return [str(item) for item in presets if item]
-            
-            # Format B: Direct list [...]
-            if isinstance(data, list):
-                return [str(item) for item in data if item]
+        return self.load_yaml_document(file_path)[0]
+    
+    def load_yaml_document(self, file_path, version=None):
+        """
+        Parse a YAML file once for both uses (only version[1] bytes with version)
+        Returns (preset lines as in load_yaml_presets, parsed structure or None)
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                content = f.read(version[1] if version else -1)
             
-            # Format C: Nested dictionary structure
-            if isinstance(data, dict):
-                return self.flatten_yaml_dict(data)
+            data = self._load_yaml_snapshot(file_path, content) if YAML_SNAPSHOTS else None
+            if data is None:
+                data = yaml.load(content.decode('utf-8'), Loader=YAML_LOADER)
+                if YAML_SNAPSHOTS and data is not None:
+                    self._save_yaml_snapshot(file_path, content, data)
             
-            return []
+            return self.yaml_data_to_presets(data), data
             
         except Exception as e:
             print(f"[Prompt Preset Selector] Error parsing YAML: {e}")
+            return [], None
+    
+    _YAML_SNAPSHOT_HEADER = struct.Struct('=8s20s')  # magic, sha1 of content + loader/Python version
+    _YAML_SNAPSHOT_MAGIC = b'PPYSNP02'
+    
+    @staticmethod
+    def _yaml_snapshot_path(file_path):
+        """
+        Snapshot file of file_path; named by path (like the .txt line indexes),
+        so saving a new version overwrites the old snapshot
+        """
+        digest = hashlib.sha1(str(Path(file_path).resolve()).encode('utf-8')).hexdigest()
+        return CACHE_DIR / f"{digest}.yamlsnap"
+    
+    @staticmethod
+    def _yaml_content_digest(content):
+        """sha1 identifying content parsed by this loader and Python version"""
+        hasher = hashlib.sha1(content)
+        hasher.update(f"{YAML_LOADER.__name__}-{sys.version_info[0]}.{sys.version_info[1]}".encode('ascii'))
+        return hasher.digest()
+    
+    def _load_yaml_snapshot(self, file_path, content):
+        """Return the parsed structure saved for file_path, or None if it was saved for other content"""
+        try:
+            with open(self._yaml_snapshot_path(file_path), 'rb') as f:
+                header = f.read(self._YAML_SNAPSHOT_HEADER.size)
+                magic, digest = self._YAML_SNAPSHOT_HEADER.unpack(header)
+                if magic != self._YAML_SNAPSHOT_MAGIC or digest != self._yaml_content_digest(content):
+                    return None
+                return marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError, struct.error):
+            return None
+    
+    def _save_yaml_snapshot(self, file_path, content, data):
+        snapshot_path = self._yaml_snapshot_path(file_path)
+        tmp_path = snapshot_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            # Raises ValueError for types marshal cannot store (e.g. YAML timestamps)
+            payload = marshal.dumps(data)
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(self._YAML_SNAPSHOT_HEADER.pack(self._YAML_SNAPSHOT_MAGIC, self._yaml_content_digest(content)))
+                f.write(payload)
+            os.replace(tmp_path, snapshot_path)
+        except (OSError, ValueError):
+            pass
+    
+    def yaml_data_to_presets(self, data):
+        """Flatten a parsed YAML document into preset lines (see load_yaml_presets)"""
+        if data is None:
             return []
+        
+        # Format A: {'presets': [...]}
+        if isinstance(data, dict) and 'presets' in data:
+            presets = data['presets']
+            if isinstance(presets, list):
+                return [self.yaml_item_to_preset(item) for item in presets if item]
+        
+        # Format B: Direct list [...]
+        if isinstance(data, list):
+            return [self.yaml_item_to_preset(item) for item in data if item]
+        
+        # Format C: Nested dictionary structure
+        if isinstance(data, dict):
+            return self.flatten_yaml_dict(data)
+        
+        return []
     
     def flatten_yaml_dict(self, data, parent_keys=[]):
         """
@@ -227,17 +2454,38 @@ class PromptPresetSelector:
                     key_prefix = ":".join(current_keys) + ": "
                     for item in value:
                         if item:
-                            lines.append(key_prefix + str(item))
+                            lines.append(self.yaml_item_to_preset(item, key_prefix))
                 elif isinstance(value, dict):
                     # Nested dict, recurse with accumulated keys
                     lines.extend(self.flatten_yaml_dict(value, current_keys))
                 elif isinstance(value, str):
                     # Single string value
                     key_prefix = ":".join(current_keys) + ": "
-                    lines.append(key_prefix + value)
+                    lines.append(self.yaml_item_to_preset(value, key_prefix))
         
         return lines
     
+    def yaml_item_to_preset(self, item, key_prefix=""):
+        """
+        Convert one YAML list item to a preset line
+        Weighted items are written "3::text" or as a mapping {text: ..., weight: 3};
+        the weight is moved in front of the key hierarchy: "3::key1:key2: text"
+        """
+        if isinstance(item, dict) and 'text' in item:
+            text = str(item['text'])
+            try:
+                weight = float(item.get('weight', 1))
+            except (TypeError, ValueError):
+                weight = 1.0
+            weight = max(0.0, weight) if math.isfinite(weight) else 1.0
+        else:
+            weight, text = split_weight(str(item))
+        
+        line = key_prefix + text
+        if weight == 1.0:
+            return line
+        return f"{format_weight(weight)}::{line}"
+    
     def parse_keywords(self, keyword_string):
         """
         Parse keyword string into phrases and individual keywords, including exclusions
@@ -255,8 +2503,7 @@ class PromptPresetSelector:
         exclude_keywords = []
         
         # Match quoted phrases or individual words, with optional minus prefix
-        pattern = r'(-?)"([^"]+)"|(-?)([^,\s]+)'
-        matches = re.findall(pattern, keyword_string)
+        matches = _KEYWORD_PATTERN.findall(keyword_string)
         
         for minus1, phrase, minus2, word in matches:
             is_exclude = (minus1 == '-' or minus2 == '-')
@@ -275,49 +2522,53 @@ class PromptPresetSelector:
         
         return (include_keywords, exclude_keywords)
     
-    def filter_by_keywords(self, lines, include_keywords, exclude_keywords, mode):
+    def filter_by_keywords(self, lines, include_keywords, exclude_keywords, mode, search_index=None):
         """
-        Filter lines based on include/exclude keywords and mode (AND/OR)
+        Filter lines based on include/exclude keywords and mode (AND/OR/REGEX/FUZZY)
         
         Process:
-        1. Filter by include keywords (if any) using AND/OR mode
+        1. Filter by include keywords (if any) using the mode (FUZZY results are ranked)
         2. Remove lines matching any exclude keyword (always applied)
         
+        Args:
+            search_index: PresetSearchIndex for lines (e.g. PresetFileEntry.search_index);
+                          a temporary one is built when omitted
+        
         Returns:
             List of tuples: [(original_index, line_text), ...]
         """
         if not include_keywords and not exclude_keywords:
             return [(i, line) for i, line in enumerate(lines)]
         
-        # Step 1: Apply inclusion filter
-        if include_keywords and mode != "OFF":
-            filtered = []
-            for i, line in enumerate(lines):
-                line_lower = line.lower()
-                keyword_matches = [kw.lower() in line_lower for kw in include_keywords]
-                
-                if mode == "AND":
-                    if all(keyword_matches):
-                        filtered.append((i, line))
-                elif mode == "OR":
-                    if any(keyword_matches):
-                        filtered.append((i, line))
-        else:
-            # No include keywords or mode is OFF, start with all lines
-            filtered = [(i, line) for i, line in enumerate(lines)]
-        
-        # Step 2: Apply exclusion filter (always applied if exclusions exist)
-        if exclude_keywords:
-            result = []
-            for i, line in filtered:
-                line_lower = line.lower()
-                # Exclude if line contains ANY of the exclude keywords
-                has_exclude = any(kw.lower() in line_lower for kw in exclude_keywords)
-                if not has_exclude:
-                    result.append((i, line))
-            return result
+        if search_index is None:
+            search_index = PresetSearchIndex(lines, use_trigrams=False)
         
-        return filtered
+        indices = search_index.query(include_keywords, exclude_keywords, mode)
+        return [(i, lines[i]) for i in indices]
+    
+    def filter_indices(self, entry, include_keywords, exclude_keywords, mode):
+        """
+        Return the original line numbers of entry.lines that pass the keyword filter
+        Results are memoized per file version and query, so repeated runs with
+        the same keywords (e.g. Sequential (continue)) do not filter again;
+        a PresetCorpus is filtered per member file
+        """
+        if mode == "OFF":
+            include_keywords = []
+        if not include_keywords and not exclude_keywords:
+            return range(len(entry.lines))
+        
+        cache_key = (str(entry.path), entry.version, tuple(include_keywords), tuple(exclude_keywords), mode)
+        indices = _filter_result_cache.get(cache_key)
+        if indices is None:
+            if isinstance(entry, PresetCorpus):
+                # Filter file by file, so unchanged members answer from this cache
+                parts = [self.filter_indices(member, include_keywords, exclude_keywords, mode) for member in entry.entries]
+                indices = entry.merge_indices(parts, include_keywords if mode == "FUZZY" else None)
+            else:
+                indices = array('I', entry.search_index.query(include_keywords, exclude_keywords, mode))
+            _filter_result_cache.put(cache_key, indices)
+        return indices
     
     def generate_preset_list(self, lines):
         """Generate numbered list of all presets"""
@@ -329,6 +2580,35 @@ class PromptPresetSelector:
             result.append(f"{i}: {line}")
         return "\n".join(result)
     
+    def generate_preset_list_page(self, lines, offset, page_size):
+        """Generate numbered list of presets [offset, offset + page_size) with a position footer"""
+        if not lines:
+            return "(No presets available)"
+        
+        total = len(lines)
+        start = min(offset, total)
+        end = min(start + page_size, total)
+        
+        result = [f"{i}: {lines[i]}" for i in range(start, end)]
+        if start == end:
+            result.append(f"(Offset {offset} is past the end of {total} presets)")
+        elif start > 0 or end < total:
+            result.append(f"(Showing {start}-{end - 1} of {total} presets)")
+        return "\n".join(result)
+    
+    def render_preset_list(self, entry, preset_list_mode, list_offset, list_page_size):
+        """
+        Render the preset_list output for a loaded file
+        - Full: numbered list of all presets (cached per file version)
+        - Page: list_page_size presets starting at list_offset
+        - Off: not rendered (useful for very large files)
+        """
+        if preset_list_mode == "Off":
+            return "(Preset list disabled)"
+        if preset_list_mode == "Page":
+            return self.generate_preset_list_page(entry.lines, list_offset, list_page_size)
+        return entry.preset_list
+
     def strip_key_hierarchy(self, text):
         """
         Remove YAML key hierarchy prefix from preset text
@@ -350,8 +2630,23 @@ class PromptPresetSelector:
         # No key hierarchy found, return as-is
         return text
     
-    def select_preset(self, preset_file, absolute_path, keyword, keyword_mode, selection_mode, preset_index, seed):
+    def select_preset(self, preset_file, absolute_path, keyword, keyword_mode, selection_mode, preset_index, seed,
+                      preset_list_mode="Full", list_offset=0, list_page_size=PRESET_LIST_DEFAULT_PAGE_SIZE):
         """Main selection logic with support for absolute paths"""
+        selection, result = self.prepare_selection(
+            preset_file, absolute_path, keyword, keyword_mode,
+            preset_list_mode, list_offset, list_page_size
+        )
+        if selection is None:
+            return result
+        return self.select_from(selection, selection_mode, preset_index, seed)
+    
+    def prepare_selection(self, preset_file, absolute_path, keyword, keyword_mode,
+                          preset_list_mode="Full", list_offset=0, list_page_size=PRESET_LIST_DEFAULT_PAGE_SIZE):
+        """
+        Resolve, load and filter the preset file (everything that does not depend on the index/seed)
+        Returns (selection, None), or (None, outputs) when there is nothing to select from
+        """
         
         # Determine which file to use: absolute_path takes priority
         if absolute_path and absolute_path.strip():
@@ -359,47 +2654,71 @@ class PromptPresetSelector:
             file_to_load = absolute_path.strip()
             file_identifier = file_to_load  # For state key
             
-            # Validate file exists
-            if not os.path.exists(file_to_load):
+            # Validate file exists (a folder or glob is checked when its files are listed)
+            if not is_preset_corpus(file_to_load) and not os.path.exists(file_to_load):
                 error_msg = f"Absolute path not found: {file_to_load}"
                 print(f"[Prompt Preset Selector] Error: {error_msg}")
-                return ("", "", error_msg)
+                return None, ("", "", error_msg)
             
             # Validate file extension
-            if not file_to_load.lower().endswith(('.txt', '.yaml', '.yml')):
+            if not is_preset_corpus(file_to_load) and not file_to_load.lower().endswith(('.txt', '.yaml', '.yml')):
                 error_msg = f"Unsupported file type. Use .txt, .yaml, or .yml: {file_to_load}"
                 print(f"[Prompt Preset Selector] Error: {error_msg}")
-                return ("", "", error_msg)
+                return None, ("", "", error_msg)
         else:
             # Use preset_file from dropdown
             if preset_file == "(No preset files found)":
                 print("[Prompt Preset Selector] Warning: No preset files available")
-                return ("", "(No preset files found)", "")
+                return None, ("", "(No preset files found)", "")
             
             file_to_load = preset_file
             file_identifier = preset_file
         
-        # Load all presets (unfiltered)
-        all_lines = self.load_preset_lines(file_to_load)
+        # Load all presets (unfiltered); a folder or glob is merged into one list
+        if is_preset_corpus(file_to_load):
+            entry = self.load_preset_corpus(file_to_load)
+        else:
+            entry = self.load_preset_entry(file_to_load)
+        all_lines = entry.lines if entry else []
         if not all_lines:
             print(f"[Prompt Preset Selector] Warning: Preset file '{file_identifier}' is empty or failed to load")
-            return ("", "(File is empty or failed to load)", "")
+            return None, ("", "(File is empty or failed to load)", "")
         
-        # Generate full preset list (for reference)
-        preset_list = self.generate_preset_list(all_lines)
+        # Generate preset list (for reference)
+        preset_list = self.render_preset_list(entry, preset_list_mode, list_offset, list_page_size)
         
         # Parse and apply keyword filtering
         include_keywords, exclude_keywords = self.parse_keywords(keyword)
-        filtered_items = self.filter_by_keywords(all_lines, include_keywords, exclude_keywords, keyword_mode)
+        try:
+            filtered_indices = self.filter_indices(entry, include_keywords, exclude_keywords, keyword_mode)
+        except re.error as e:
+            warning = f"Invalid regular expression in keywords: {e}"
+            print(f"[Prompt Preset Selector] Warning: {warning}")
+            return None, ("", preset_list, warning)
         
         # Check if filtering resulted in empty list
-        if not filtered_items:
+        if not filtered_indices:
             warning = f"No presets match keywords: {keyword}"
             print(f"[Prompt Preset Selector] Warning: {warning}")
-            return ("", preset_list, warning)
-        
-        # State key for Sequential (continue) mode
-        state_key = f"{file_identifier}_{keyword}_{keyword_mode}"
+            return None, ("", preset_list, warning)
+        
+        selection = {
+            "entry": entry,
+            "preset_list": preset_list,
+            "filtered_indices": filtered_indices,
+            # State key for Sequential (continue) mode
+            "state_key": f"{file_identifier}_{keyword}_{keyword_mode}",
+            # Identifies filtered_indices for per-query caches (weights)
+            "query": (tuple(include_keywords), tuple(exclude_keywords), keyword_mode),
+        }
+        return selection, None
+    
+    def select_from(self, selection, selection_mode, preset_index, seed):
+        """Select one preset from a prepared selection; returns (text, preset_list, info)"""
+        all_lines = selection["entry"].lines
+        filtered_indices = selection["filtered_indices"]
+        preset_list = selection["preset_list"]
+        state_key = selection["state_key"]
         
         # Selection based on mode
         selected_text = ""
@@ -408,43 +2727,100 @@ class PromptPresetSelector:
         
         if selection_mode == "Manual":
             # Use preset_index directly on filtered list
-            selected_index = preset_index % len(filtered_items)
-            original_index, selected_text = filtered_items[selected_index]
+            selected_index = preset_index % len(filtered_indices)
+            original_index = filtered_indices[selected_index]
+            selected_text = all_lines[original_index]
             print(f"[Prompt Preset Selector] Manual: index={preset_index} -> {selected_text}")
         
         elif selection_mode == "Sequential":
             # Start from preset_index each time
-            selected_index = preset_index % len(filtered_items)
-            original_index, selected_text = filtered_items[selected_index]
+            selected_index = preset_index % len(filtered_indices)
+            original_index = filtered_indices[selected_index]
+            selected_text = all_lines[original_index]
             print(f"[Prompt Preset Selector] Sequential (from {preset_index}): index={selected_index} -> {selected_text}")
         
         elif selection_mode == "Sequential (continue)":
             # Continue from last position, or start from preset_index
-            if state_key not in self._continue_state:
-                self._continue_state[state_key] = preset_index % len(filtered_items)
+            total = len(filtered_indices)
             
-            selected_index = self._continue_state[state_key]
-            original_index, selected_text = filtered_items[selected_index]
+            def advance(cursor):
+                # Take the current position and store the next one for the next execution
+                index = (preset_index if cursor is None else cursor) % total
+                return (index + 1) % total, index
             
-            # Advance to next position for next execution
-            self._continue_state[state_key] = (selected_index + 1) % len(filtered_items)
+            selected_index = self._cursor_store.update("continue", state_key, advance)
+            original_index = filtered_indices[selected_index]
+            selected_text = all_lines[original_index]
             print(f"[Prompt Preset Selector] Sequential (continue): index={selected_index} -> {selected_text}")
         
         elif selection_mode == "Random":
-            # Random selection with seed
-            random.seed(seed)
-            selected_index = random.randint(0, len(filtered_items) - 1)
-            original_index, selected_text = filtered_items[selected_index]
+            # Random selection with seed (own generator, the global random module is untouched)
+            rng = random.Random(seed)
+            table = selection["entry"].line_alias_table(selection["query"], filtered_indices)
+            if table is None:
+                selected_index = rng.randint(0, len(filtered_indices) - 1)
+            else:
+                # Weighted presets: constant-time draw from the alias table
+                selected_index = table.sample(rng)
+            original_index = filtered_indices[selected_index]
+            selected_text = all_lines[original_index]
             print(f"[Prompt Preset Selector] Random (seed={seed}): index={selected_index} -> {selected_text}")
         
+        elif selection_mode == "Shuffle":
+            # Walk a seed-determined permutation: no repeats until every preset was used
+            selected_index = self.shuffle_positions(selection, preset_index, seed, 1)[0]
+            original_index = filtered_indices[selected_index]
+            selected_text = all_lines[original_index]
+            print(f"[Prompt Preset Selector] Shuffle (seed={seed}): index={selected_index} -> {selected_text}")
+        
+        return self.format_selection(selection, selection_mode, selected_index)
+    
+    def format_selection(self, selection, selection_mode, selected_index):
+        """Build the (text, preset_list, info) outputs for an index into the filtered list"""
+        all_lines = selection["entry"].lines
+        filtered_indices = selection["filtered_indices"]
+        original_index = filtered_indices[selected_index]
+        selected_text = all_lines[original_index]
+        
         # Info output shows selection details with ORIGINAL index
-        info = f"Selected: {original_index}: {selected_text}\nMode: {selection_mode}\nFiltered: {len(filtered_items)}/{len(all_lines)} presets"
+        info = f"Selected: {original_index}: {selected_text}\nMode: {selection_mode}\nFiltered: {len(filtered_indices)}/{len(all_lines)} presets"
+        if isinstance(selection["entry"], PresetCorpus):
+            info += f"\nFile: {selection['entry'].source(original_index).path}"
         
-        # Strip key hierarchy from text output (for actual prompt use)
+        # Strip weight and key hierarchy from text output (for actual prompt use)
         # Keep full text with keys in preset_list and info (for reference)
-        output_text = self.strip_key_hierarchy(selected_text)
+        output_text = self.strip_key_hierarchy(split_weight(selected_text)[1])
+        
+        return (output_text, selection["preset_list"], info)
+    
+    def shuffle_positions(self, selection, preset_index, seed, count):
+        """
+        Next count indices (into the filtered list) of the Shuffle order for seed
+        Only the seed and a cursor are kept per state key; a new seed starts a
+        new permutation from preset_index
+        """
+        total = len(selection["filtered_indices"])
+        
+        def advance(state):
+            if state is None or state[0] != seed:
+                cursor = preset_index % total
+            else:
+                cursor = state[1] % total
+            return (seed, (cursor + count) % total), cursor
         
-        return (output_text, preset_list, info)
+        cursor = self._cursor_store.update("shuffle", selection["state_key"], advance)
+        return ShufflePermutation(total, seed).window(cursor, count)
+
+    def batch_selections(self, selection, selection_mode, preset_index, seed, count):
+        """
+        count (text, preset_list, info) selections, item k as with preset_index + k and seed + k
+        Shuffle keeps one seed and takes the whole window of the permutation at once
+        """
+        if selection_mode == "Shuffle":
+            positions = self.shuffle_positions(selection, preset_index, seed, count)
+            print(f"[Prompt Preset Selector] Shuffle (seed={seed}): {count} presets from index {positions[0]}")
+            return [self.format_selection(selection, selection_mode, position) for position in positions]
+        return [self.select_from(selection, selection_mode, preset_index + k, seed + k) for k in range(count)]
 
 
 class PromptPresetSelectorWithWildcard(PromptPresetSelector):
@@ -457,15 +2833,10 @@ class PromptPresetSelectorWithWildcard(PromptPresetSelector):
     # Default wildcard directory (shared with ComfyUI-Impact-Pack)
     DEFAULT_WILDCARD_DIR = "../ComfyUI-Impact-Pack/wildcards"
     
-    # Class variable to track wildcard state for sequential mode
-    _wildcard_state = {}
-    
     def __init__(self):
         super().__init__()
         # Set up wildcard directory
         self.wildcard_dir = self._get_wildcard_dir()
-        # Cache for YAML structure (for key-based wildcards)
-        self._yaml_structure_cache = {}
     
     def _get_wildcard_dir(self):
         """Get the wildcard directory path"""
@@ -487,31 +2858,69 @@ class PromptPresetSelectorWithWildcard(PromptPresetSelector):
     def load_yaml_structure(self, file_path):
         """
         Load YAML file and preserve its structure for key-based wildcards
-        Caches the structure for reuse
+        The structure comes from the shared preset cache, parsed together with
+        the preset list and re-parsed only when the file changes
         """
-        file_path_str = str(file_path)
-        
-        # Check cache first
-        if file_path_str in self._yaml_structure_cache:
-            return self._yaml_structure_cache[file_path_str]
+        if not YAML_AVAILABLE:
+            return None
         
+        entry = self.load_preset_entry(Path(file_path))
+        return entry.yaml_data if entry else None
+    
+    def load_yaml_key_index(self, file_path):
+        """
+        Get the key -> choices index (see build_yaml_key_index) for a YAML file
+        Returns None if the file has no YAML structure
+        """
         if not YAML_AVAILABLE:
             return None
         
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-            
-            if data is None:
-                return None
-            
-            # Cache the structure
-            self._yaml_structure_cache[file_path_str] = data
-            return data
-            
-        except Exception as e:
-            print(f"[Wildcard Preset Selector] Error loading YAML structure: {e}")
+        entry = self.load_preset_entry(Path(file_path))
+        if not entry or not entry.yaml_data:
             return None
+        
+        # Built once per file version and kept with the cached entry
+        return entry.derive('yaml_key_index', lambda: self.build_yaml_key_index(entry.yaml_data))
+    
+    def warm_preset_file(self, preset_file):
+        """
+        Load preset_file and build the indexes executions use; returns the entry or None
+        The full preset list is left to be rendered on first use (it can be large)
+        """
+        entry = self.load_preset_entry(preset_file)
+        if entry is None:
+            return None
+        search_index = entry.search_index
+        if search_index.use_trigrams:
+            search_index._build_postings()
+        entry.wildcard_references
+        if entry.yaml_data:
+            self.load_yaml_key_index(entry.path)
+        return entry
+    
+    def prepare_refreshed_entry(self, entry, old):
+        super().prepare_refreshed_entry(entry, old)
+        if old is not None and old.yaml_key_index is not None and entry.yaml_data:
+            entry.derive('yaml_key_index', lambda: self.build_yaml_key_index(entry.yaml_data))
+    
+    def build_yaml_key_index(self, yaml_data):
+        """
+        Map every key in yaml_data to the choices get_yaml_key_content returns for it
+        
+        Same "first match wins" rules: a key directly in a dict wins over
+        nested ones (even if empty); otherwise the first nested dict, in
+        order, with non-empty content for the key wins.
+        """
+        if not isinstance(yaml_data, dict):
+            return {}
+        
+        key_index = {key: self._extract_content_from_value(value) for key, value in yaml_data.items()}
+        for value in yaml_data.values():
+            if isinstance(value, dict):
+                for key, choices in self.build_yaml_key_index(value).items():
+                    if choices and key not in key_index:
+                        key_index[key] = choices
+        return key_index
     
     def get_yaml_key_content(self, yaml_data, key):
         """
@@ -545,8 +2954,8 @@ class PromptPresetSelectorWithWildcard(PromptPresetSelector):
         Returns a flat list of strings
         """
         if isinstance(content, list):
-            # Simple list - return as is
-            return [str(item) for item in content if item]
+            # Simple list - return as is (weighted mappings become "weight::text")
+            return [self.yaml_item_to_preset(item) for item in content if item]
         
         if isinstance(content, dict):
             # Dict - flatten all values recursively
@@ -560,8 +2969,7 @@ class PromptPresetSelectorWithWildcard(PromptPresetSelector):
     
     @classmethod
     def INPUT_TYPES(cls):
-        instance = cls()
-        preset_files = instance.get_preset_files()
+        preset_files = list_preset_choices()
         
         if not preset_files:
             preset_files = ["(No preset files found)"]
@@ -569,13 +2977,18 @@ class PromptPresetSelectorWithWildcard(PromptPresetSelector):
         return {
             "required": {
                 "preset_file": (preset_files,),
-                "absolute_path": ("STRING", {"default": "", "multiline": False, "placeholder": "Optional: /absolute/path/to/file.txt or .yaml"}),
+                "absolute_path": ("STRING", {"default": "", "multiline": False, "placeholder": "Optional: /absolute/path/to/file.txt or .yaml, a folder or a glob"}),
                 "keyword": ("STRING", {"default": "", "multiline": False}),
-                "keyword_mode": (["OFF", "AND", "OR"], {"default": "OFF"}),
-                "selection_mode": (["Manual", "Sequential", "Sequential (continue)", "Random"], {"default": "Manual"}),
+                "keyword_mode": (KEYWORD_MODES, {"default": "OFF"}),
+                "selection_mode": (["Manual", "Sequential", "Sequential (continue)", "Random", "Shuffle"], {"default": "Manual"}),
                 "preset_index": ("INT", {"default": 0, "min": 0, "max": 9999, "step": 1}),
                 "seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff}),
                 "enable_wildcard": ("BOOLEAN", {"default": True}),
+            },
+            "optional": {
+                "preset_list_mode": (PRESET_LIST_MODES, {"default": "Full"}),
+                "list_offset": ("INT", {"default": 0, "min": 0, "max": 0xffffffff, "step": 1}),
+                "list_page_size": ("INT", {"default": PRESET_LIST_DEFAULT_PAGE_SIZE, "min": 1, "max": 100000, "step": 1}),
             }
         }
     
@@ -585,284 +2998,553 @@ class PromptPresetSelectorWithWildcard(PromptPresetSelector):
     CATEGORY = "text"
     
     @classmethod
-    def IS_CHANGED(cls, preset_file, absolute_path, keyword, keyword_mode, selection_mode, preset_index, seed, enable_wildcard):
-        return f"{preset_file}_{absolute_path}_{keyword}_{keyword_mode}_{selection_mode}_{preset_index}_{seed}_{enable_wildcard}"
+    def IS_CHANGED(cls, preset_file, absolute_path, keyword, keyword_mode, selection_mode, preset_index, seed, enable_wildcard,
+                   preset_list_mode="Full", list_offset=0, list_page_size=PRESET_LIST_DEFAULT_PAGE_SIZE):
+        """
+        The inputs plus (mtime_ns, size) of the selected file and, with
+        wildcards enabled, of every wildcard file it can reach
+        Sequential wildcards advance their cursors, so they always re-run too
+        """
+        if selection_mode in STATEFUL_SELECTION_MODES or (enable_wildcard and selection_mode == "Sequential"):
+            return float("nan")
+        
+        fingerprint = input_fingerprint(preset_file, absolute_path)
+        if enable_wildcard and fingerprint is not None:
+            dependencies = {}
+            for file_path in resolve_input_files(preset_file, absolute_path):
+                dependencies.update(cls.shared_instance().wildcard_dependencies(file_path))
+            stats = sorted((name, [file_fingerprint(path) for path in paths]) for name, paths in dependencies.items())
+            fingerprint = f"{fingerprint}_{hashlib.sha1(repr(stats).encode('utf-8')).hexdigest()}"
+        return f"{preset_file}_{absolute_path}_{keyword}_{keyword_mode}_{selection_mode}_{preset_index}_{seed}_{enable_wildcard}_{preset_list_mode}_{list_offset}_{list_page_size}_{fingerprint}"
+    
+    def wildcard_dependencies(self, file_path):
+        """
+        name -> paths of every __name__ wildcard file reachable from file_path
+        (following references inside the wildcard files too); a glob maps
+        to all its matches, a missing file to ()
+        """
+        dependencies = {}
+        pending = [Path(file_path)]
+        while pending:
+            for name in self.wildcard_reference_names(pending.pop()):
+                if name in dependencies:
+                    continue
+                if is_wildcard_glob(name):
+                    paths = tuple(path for _, path in match_wildcard_paths(name))
+                else:
+                    path = resolve_wildcard_path(name)
+                    paths = (path,) if path is not None else ()
+                dependencies[name] = paths
+                pending.extend(paths)
+        return dependencies
+    
+    def wildcard_reference_names(self, file_path):
+        """
+        entry.wildcard_references of file_path, remembered per (path, mtime_ns, size)
+        apart from the parsed entries, so an unchanged file costs one stat
+        even after its entry was evicted from the file cache
+        """
+        version = file_fingerprint(file_path)
+        if version is None:
+            return frozenset()
+        key = (str(file_path), version)
+        names = _wildcard_reference_cache.get(key)
+        if names is None:
+            entry = self.load_preset_entry(file_path)
+            names = entry.wildcard_references if entry else frozenset()
+            _wildcard_reference_cache.put(key, names)
+        return names
     
     def expand_wildcards(self, text, seed, selection_mode, state_key="", current_file=None):
         """
-        Expand wildcard syntax in text - FIXED to recursively expand
+        Expand wildcard syntax in text
         - {A|B|C} -> choice from A, B, C (random or sequential)
         - __filename__ -> line from wildcards/filename.txt (random or sequential)
         - {__key__|__key__} -> content from YAML keys in current file (Impact Pack style)
-        - Supports nesting: {A|{B|C}}
+        - Supports nesting: {A|{B|C}}, and wildcards inside selected lines/YAML values
+        
+        The text is compiled once into a WildcardTemplate (cached) and evaluated
+        in a single pass. A file or YAML key that (indirectly) references itself
+        is left unexpanded instead of looping.
         
         selection_mode determines behavior:
         - Sequential / Sequential (continue): cycle through options in order
-        - Random / Manual: random selection based on seed
+        - Random / Manual / Shuffle: random selection based on seed
         """
         if not text:
             return text
         
+        template = compile_wildcard_template(text)
+        if not template.has_wildcards:
+            return text
+        
         # Determine if we should use sequential selection
+        # (cursors are tracked per state_key and wildcard position)
         is_sequential = selection_mode in ["Sequential", "Sequential (continue)"]
         
-        if is_sequential:
-            # For sequential mode, use state_key to track position
-            if not hasattr(self, '_wildcard_state'):
-                self._wildcard_state = {}
-        else:
-            # For random/manual mode, use seed
-            random.seed(seed)
-        
-        # FIXED: Recursively expand wildcards until no more wildcards remain
-        max_depth = 10  # Prevent infinite loops
-        depth = 0
-        
-        while depth < max_depth:
-            original_text = text
-            
-            # First, expand YAML key-based wildcards {__key__|__key__}
-            text = self._expand_yaml_key_wildcards(text, is_sequential, state_key, current_file)
-            
-            # Process __filename__ wildcards
-            text = self._expand_file_wildcards(text, is_sequential, state_key)
-            
-            # Process {A|B|C} wildcards with nesting support
-            text = self._expand_choice_wildcards(text, is_sequential, state_key)
-            
-            # If nothing changed, we're done
-            if text == original_text:
-                break
+        context = {
+            "is_sequential": is_sequential,
+            "state_key": state_key,
+            # For random/manual mode, each draw is derived from seed and wildcard position
+            "seed": seed,
+            "draws": {},
+            "current_file": current_file,
+            "yaml_loaded": False,
+            "yaml_key_index": None,
+            "yaml_entry": None,
+        }
+        try:
+            return self._evaluate_nodes(template.nodes, context, "", ())
+        except RecursionError:
+            print("[Wildcard Preset Selector] Warning: Wildcards nested too deeply, text left unexpanded")
+            return text
+    
+    def _pick_index(self, count, context, position, table=None):
+        """
+        Pick an index in range(count) for the wildcard at position
+        - Sequential: cycle through the options, tracked per state key and position
+        - Random: derived from seed, position and how often position was drawn
+          in this expansion, so no shared RNG state is involved; drawn from
+          table (an AliasTable) when the options are weighted
+        """
+        if context["is_sequential"]:
+            def advance(cursor):
+                # Take the current option and move on for the next execution
+                index = (cursor or 0) % count
+                return (index + 1) % count, index
             
-            depth += 1
+            return self._cursor_store.update("wildcard", f"{context['state_key']}_{position}", advance)
         
-        if depth >= max_depth:
-            print(f"[Wildcard Preset Selector] Warning: Maximum recursion depth reached")
-        
-        return text
+        draw = context["draws"].get(position, 0)
+        context["draws"][position] = draw + 1
+        if table is not None:
+            return table.sample_seeded(context["seed"], position, draw)
+        return seeded_index(count, context["seed"], position, draw)
+    
+    def _evaluate_nodes(self, nodes, context, source, active):
+        """
+        Evaluate compiled template nodes to text
+        source prefixes sequential state keys of nested templates,
+        active holds the file/YAML references currently being expanded
+        """
+        parts = []
+        for node in nodes:
+            if isinstance(node, str):
+                parts.append(node)
+                continue
+            
+            kind = node[0]
+            if kind == 'choice':
+                options = node[1]
+                index = self._pick_index(len(options), context, f"choice_{source}{node[2]}")
+                # Stripped after expansion, so a group that lost its braces is trimmed too
+                parts.append(self._evaluate_nodes(options[index], context, source, active).strip())
+            elif kind == 'file':
+                parts.append(self._expand_file_reference(node[1], context, active))
+            elif kind == 'yaml':
+                parts.append(self._expand_yaml_key_reference(node, context, source, active))
+            elif node[2]:
+                parts.append(self._evaluate_nodes(node[1], context, source, active))
+            else:
+                parts.append("{" + self._evaluate_nodes(node[1], context, source, active) + "}")
+        return "".join(parts)
     
-    def _expand_yaml_key_wildcards(self, text, is_sequential, state_key, current_file):
+    def _expand_selected(self, text, context, reference, active):
+        """Expand wildcards inside a line picked from a file or YAML key (its weight is dropped)"""
+        text = split_weight(text)[1]
+        template = compile_wildcard_template(text)
+        if not template.has_wildcards:
+            return text
+        return self._evaluate_nodes(template.nodes, context, f"{reference}:", active + (reference,))
+    
+    def _expand_yaml_key_reference(self, node, context, source, active):
         """
         Expand Impact Pack style {__key__|__key__} wildcards
         Selects content from YAML keys in the current file
         """
-        if not current_file:
-            return text
-        
-        # Load YAML structure
-        yaml_data = self.load_yaml_structure(current_file)
-        if not yaml_data:
-            return text
-        
-        # Pattern: {__key1__|__key2__|...}
-        # Match {...} containing __key__ patterns
-        pattern = r'\{(__[^}]+__(?:\|__[^}]+__)*)\}'
-        
-        def replace_yaml_key(match):
-            keys_str = match.group(1)
-            # Extract individual __key__ patterns
-            # Support all characters except __, |, {, }
-            keys = re.findall(r'__(.+?)__', keys_str)
-            
-            if not keys:
-                return match.group(0)
-            
-            # Collect all possible choices from all keys
-            all_choices = []
+        _, keys, options = node
+        reference = "yamlkey_" + "|".join(keys)
+        
+        if reference in active:
+            print(f"[Wildcard Preset Selector] Warning: Circular wildcard reference to YAML keys: {list(keys)}")
+            return "{" + "|".join(f"__{key}__" for key in keys) + "}"
+        
+        # Load the key index of the current file once per expansion
+        if not context["yaml_loaded"]:
+            context["yaml_loaded"] = True
+            if context["current_file"] and not is_preset_corpus(str(context["current_file"])):
+                context["yaml_key_index"] = self.load_yaml_key_index(context["current_file"])
+                context["yaml_entry"] = self.load_preset_entry(Path(context["current_file"]))
+        key_index = context["yaml_key_index"]
+        
+        # Collect all possible choices from all keys
+        all_choices = []
+        if key_index is not None:
             for key in keys:
-                key_content = self.get_yaml_key_content(yaml_data, key)
-                all_choices.extend(key_content)
-            
+                all_choices.extend(key_index.get(key, []))
             if not all_choices:
-                print(f"[Wildcard Preset Selector] Warning: No content found for YAML keys: {keys}")
-                return match.group(0)
-            
-            # Select based on mode
-            if is_sequential:
-                # Sequential: cycle through all choices
-                wc_state_key = f"{state_key}_yamlkey_{keys_str}"
-                if wc_state_key not in self._wildcard_state:
-                    self._wildcard_state[wc_state_key] = 0
-                
-                index = self._wildcard_state[wc_state_key] % len(all_choices)
-                selected = all_choices[index]
-                
-                # Advance position
-                self._wildcard_state[wc_state_key] = (index + 1) % len(all_choices)
-                return selected
-            else:
-                # Random selection
-                return random.choice(all_choices)
-        
-        return re.sub(pattern, replace_yaml_key, text)
+                print(f"[Wildcard Preset Selector] Warning: No content found for YAML keys: {list(keys)}")
+        
+        if not all_choices:
+            # Fall back to treating the keys as __filename__ choices
+            if len(options) == 1:
+                return "{" + self._evaluate_nodes(options[0], context, source, active) + "}"
+            index = self._pick_index(len(options), context, f"yamlkey_{source}{'|'.join(keys)}")
+            return self._evaluate_nodes(options[index], context, source, active).strip()
+        
+        table = None
+        if not context["is_sequential"]:
+            table = context["yaml_entry"].alias_table(("yaml",) + tuple(keys), all_choices)
+        index = self._pick_index(len(all_choices), context, reference, table)
+        return self._expand_selected(all_choices[index], context, reference, active)
     
-    def _expand_file_wildcards(self, text, is_sequential, state_key):
+    def _expand_file_reference(self, filename, context, active):
         """
-        Expand __filename__ wildcards by reading from wildcard files
+        Expand a __filename__ wildcard by reading from wildcard files
+        filename may be a path (__dir/name__) or a glob (__dir/*__), which
+        picks from the lines of all matching files together
         Searches in:
-        1. presets directory
+        1. presets directory (and its subdirectories)
         2. wildcards directory (Impact Pack)
         """
-        # Pattern: __filename__
-        pattern = r'__([a-zA-Z0-9_-]+)__'
-        
-        def replace_file_wildcard(match):
-            filename = match.group(1)
-            filepath = None
-            
-            # Try presets directory first
-            preset_path = self.preset_dir / f"{filename}.txt"
-            if preset_path.exists():
-                filepath = preset_path
-            # Then try wildcards directory
-            elif self.wildcard_dir:
-                wildcard_path = self.wildcard_dir / f"{filename}.txt"
-                if wildcard_path.exists():
-                    filepath = wildcard_path
-            
-            if not filepath:
-                print(f"[Wildcard Preset Selector] Warning: Wildcard file not found: {filename}.txt")
-                return match.group(0)  # Return original if file not found
-            
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    lines = [line.strip() for line in f if line.strip() and not line.startswith('#')]
-                
-                if not lines:
-                    print(f"[Wildcard Preset Selector] Warning: Wildcard file is empty: {filepath}")
-                    return match.group(0)
-                
-                # Select line based on mode
-                if is_sequential:
-                    # Sequential: cycle through lines
-                    wc_state_key = f"{state_key}_file_{filename}"
-                    if wc_state_key not in self._wildcard_state:
-                        self._wildcard_state[wc_state_key] = 0
-                    
-                    index = self._wildcard_state[wc_state_key] % len(lines)
-                    selected = lines[index]
-                    
-                    # Advance position for next execution
-                    self._wildcard_state[wc_state_key] = (index + 1) % len(lines)
-                    return selected
-                else:
-                    # Random selection from file
-                    return random.choice(lines)
-                
-            except Exception as e:
-                print(f"[Wildcard Preset Selector] Error reading wildcard file {filepath}: {e}")
-                return match.group(0)
-        
-        return re.sub(pattern, replace_file_wildcard, text)
-    
-    def _expand_choice_wildcards(self, text, is_sequential, state_key):
-        """Expand {A|B|C} wildcards with nesting support"""
-        max_iterations = 100  # Prevent infinite loops
-        iteration = 0
-        choice_counter = 0  # Track which choice wildcard we're processing
-        
-        while '{' in text and '|' in text and iteration < max_iterations:
-            # Find innermost {...} block
-            # Pattern: find {...} that doesn't contain another {
-            pattern = r'\{([^{}]+)\}'
-            match = re.search(pattern, text)
-            
-            if not match:
-                break
-            
-            content = match.group(1)
-            
-            # Split by | and choose
-            if '|' in content:
-                choices = [c.strip() for c in content.split('|')]
-                
-                if is_sequential:
-                    # Sequential: cycle through choices
-                    wc_state_key = f"{state_key}_choice_{choice_counter}"
-                    if wc_state_key not in self._wildcard_state:
-                        self._wildcard_state[wc_state_key] = 0
-                    
-                    index = self._wildcard_state[wc_state_key] % len(choices)
-                    selected = choices[index]
-                    
-                    # Advance position for next execution
-                    self._wildcard_state[wc_state_key] = (index + 1) % len(choices)
-                else:
-                    # Random selection
-                    selected = random.choice(choices)
-                
-                text = text[:match.start()] + selected + text[match.end():]
-                choice_counter += 1
-            else:
-                # No | found, just remove braces
-                text = text[:match.start()] + content + text[match.end():]
-            
-            iteration += 1
-        
-        if iteration >= max_iterations:
-            print(f"[Wildcard Preset Selector] Warning: Max iterations reached in wildcard expansion")
-        
-        return text
+        reference = f"file_{filename}"
+        if reference in active:
+            print(f"[Wildcard Preset Selector] Warning: Circular wildcard reference to __{filename}__")
+            return f"__{filename}__"
+        
+        entries = self._load_wildcard_file_entries(filename)
+        if not entries:
+            return f"__{filename}__"  # Return original if file not found or empty
+        
+        if len(entries) == 1:
+            entry = entries[0]
+            # Select line based on mode (weighted lines through the file's alias table)
+            table = None
+            if not context["is_sequential"]:
+                table = entry.line_alias_table((), range(len(entry.lines)))
+            index = self._pick_index(len(entry.lines), context, reference, table)
+        else:
+            # Glob: one index over the matched files' lines, in name order
+            offsets = [0]
+            for entry in entries:
+                offsets.append(offsets[-1] + len(entry.lines))
+            table = None
+            if not context["is_sequential"]:
+                table = glob_alias_table(filename, entries)
+            index = self._pick_index(offsets[-1], context, reference, table)
+            position = bisect_right(offsets, index) - 1
+            entry = entries[position]
+            index -= offsets[position]
+        
+        text = entry.lines[index]
+        if entry.yaml_data is not None:
+            # Lines of a YAML wildcard file carry their key hierarchy
+            text = self.strip_key_hierarchy(split_weight(text)[1])
+        return self._expand_selected(text, context, reference, active)
+    
+    def _load_wildcard_file_entries(self, filename):
+        """
+        Get the entries of the wildcard file(s) filename refers to, from the presets
+        or wildcards directory ([] if missing; empty files are skipped)
+        Files are read through the shared preset cache, so each is parsed once per change
+        """
+        if is_wildcard_glob(filename):
+            paths = [path for _, path in match_wildcard_paths(filename)]
+            if not paths:
+                print(f"[Wildcard Preset Selector] Warning: No wildcard files match: __{filename}__")
+        else:
+            path = resolve_wildcard_path(filename)
+            paths = [path] if path is not None else []
+            if not paths:
+                print(f"[Wildcard Preset Selector] Warning: Wildcard file not found: {filename} (.txt/.yaml/.yml)")
+        
+        entries = []
+        for path in paths:
+            entry = self.load_preset_entry(path)
+            if not entry or not entry.lines:
+                print(f"[Wildcard Preset Selector] Warning: Wildcard file is empty: {path}")
+                continue
+            entries.append(entry)
+        return entries
     
-    def select_preset_with_wildcard(self, preset_file, absolute_path, keyword, keyword_mode, selection_mode, preset_index, seed, enable_wildcard):
+    def select_preset_with_wildcard(self, preset_file, absolute_path, keyword, keyword_mode, selection_mode, preset_index, seed, enable_wildcard,
+                                    preset_list_mode="Full", list_offset=0, list_page_size=PRESET_LIST_DEFAULT_PAGE_SIZE):
         """Main selection logic with wildcard expansion support"""
         
         # First, use parent class to select preset
         text, preset_list, info = self.select_preset(
             preset_file, absolute_path, keyword, keyword_mode, 
-            selection_mode, preset_index, seed
+            selection_mode, preset_index, seed,
+            preset_list_mode, list_offset, list_page_size
         )
         
-        # Determine which file is being used (for YAML key wildcards)
-        if absolute_path and absolute_path.strip():
-            current_file = Path(absolute_path.strip())
-        else:
-            # Need to find the actual file location (presets or wildcards)
-            if preset_file != "(No preset files found)":
-                # Try presets directory first
-                preset_path = self.preset_dir / preset_file
-                if preset_path.exists():
-                    current_file = preset_path
-                else:
-                    # Try wildcards directory
-                    wildcard_dir = self._get_wildcard_dir()
-                    if wildcard_dir:
-                        wildcard_path = wildcard_dir / preset_file
-                        if wildcard_path.exists():
-                            current_file = wildcard_path
-                        else:
-                            current_file = None
-                    else:
-                        current_file = None
-            else:
-                current_file = None
-        
         # Then expand wildcards if enabled
-        if enable_wildcard and text and current_file:
-            original_text = text
-            
-            # Create state key for sequential wildcard tracking
-            file_identifier = str(current_file)
-            state_key = f"{file_identifier}_{keyword}_{keyword_mode}_wildcard"
-            
-            # Expand wildcards with mode awareness and current file context
-            text = self.expand_wildcards(text, seed, selection_mode, state_key, current_file)
-            
-            # Update info if wildcards were expanded
-            if text != original_text:
-                mode_info = "sequential" if selection_mode in ["Sequential", "Sequential (continue)"] else "random"
-                info += f"\n[Wildcards expanded: {mode_info}]"
+        if enable_wildcard:
+            current_file = self.resolve_current_file(preset_file, absolute_path)
+            text, info = self.expand_selected_text(text, info, current_file, keyword, keyword_mode, selection_mode, seed)
         
         return (text, preset_list, info)
+    
+    def resolve_current_file(self, preset_file, absolute_path):
+        """
+        Determine which file is being used (for YAML key wildcards)
+        A folder or glob input is returned as given; it has no YAML keys of its own
+        """
+        name = absolute_path.strip() if absolute_path and absolute_path.strip() else preset_file
+        if is_preset_corpus(name):
+            return name
+        return resolve_input_file(preset_file, absolute_path)
+    
+    def expand_selected_text(self, text, info, current_file, keyword, keyword_mode, selection_mode, seed):
+        """Expand wildcards in a selected preset; returns (text, info)"""
+        if not text or not current_file:
+            return text, info
+        
+        original_text = text
+        
+        # Create state key for sequential wildcard tracking
+        file_identifier = str(current_file)
+        state_key = f"{file_identifier}_{keyword}_{keyword_mode}_wildcard"
+        
+        # Expand wildcards with mode awareness and current file context
+        text = self.expand_wildcards(text, seed, selection_mode, state_key, current_file)
+        
+        # Update info if wildcards were expanded
+        if text != original_text:
+            mode_info = "sequential" if selection_mode in ["Sequential", "Sequential (continue)"] else "random"
+            info += f"\n[Wildcards expanded: {mode_info}]"
+        
+        return text, info
+
+
+BATCH_COUNT_INPUT = ("INT", {"default": 4, "min": 1, "max": 10000, "step": 1})
+
+
+class PromptPresetSelectorBatch(PromptPresetSelector):
+    """
+    Batch preset selector: returns count selections as lists from one load/filter pass
+    Item k is what the single node returns with preset_index + k and seed + k
+    (Sequential (continue) and Shuffle advance once per item, Shuffle keeps the seed)
+    """
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        input_types = super().INPUT_TYPES()
+        input_types["required"]["count"] = BATCH_COUNT_INPUT
+        return input_types
+    
+    OUTPUT_IS_LIST = (True, False, True)
+    FUNCTION = "select_presets"
+    
+    @classmethod
+    def IS_CHANGED(cls, count=1, **kwargs):
+        changed = super().IS_CHANGED(**kwargs)
+        if isinstance(changed, float):
+            return changed  # NaN: always re-run
+        return f"{changed}_{count}"
+    
+    def select_presets(self, preset_file, absolute_path, keyword, keyword_mode, selection_mode, preset_index, seed, count,
+                       preset_list_mode="Full", list_offset=0, list_page_size=PRESET_LIST_DEFAULT_PAGE_SIZE):
+        """Select count presets; returns (texts, preset_list, infos)"""
+        selection, result = self.prepare_selection(
+            preset_file, absolute_path, keyword, keyword_mode,
+            preset_list_mode, list_offset, list_page_size
+        )
+        if selection is None:
+            return ([result[0]], result[1], [result[2]])
+        
+        texts = []
+        infos = []
+        for text, _, info in self.batch_selections(selection, selection_mode, preset_index, seed, count):
+            texts.append(text)
+            infos.append(info)
+        return (texts, selection["preset_list"], infos)
+
+
+class PromptPresetSelectorWithWildcardBatch(PromptPresetSelectorWithWildcard):
+    """
+    Batch version of the wildcard selector: returns count expanded selections as lists
+    Item k is what the single node returns with preset_index + k and seed + k
+    """
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        input_types = super().INPUT_TYPES()
+        input_types["required"]["count"] = BATCH_COUNT_INPUT
+        return input_types
+    
+    OUTPUT_IS_LIST = (True, False, True)
+    FUNCTION = "select_presets_with_wildcard"
+    
+    @classmethod
+    def IS_CHANGED(cls, count=1, **kwargs):
+        changed = super().IS_CHANGED(**kwargs)
+        if isinstance(changed, float):
+            return changed  # NaN: always re-run
+        return f"{changed}_{count}"
+    
+    def select_presets_with_wildcard(self, preset_file, absolute_path, keyword, keyword_mode, selection_mode, preset_index, seed, enable_wildcard, count,
+                                     preset_list_mode="Full", list_offset=0, list_page_size=PRESET_LIST_DEFAULT_PAGE_SIZE):
+        """Select and expand count presets; returns (texts, preset_list, infos)"""
+        selection, result = self.prepare_selection(
+            preset_file, absolute_path, keyword, keyword_mode,
+            preset_list_mode, list_offset, list_page_size
+        )
+        if selection is None:
+            return ([result[0]], result[1], [result[2]])
+        
+        current_file = self.resolve_current_file(preset_file, absolute_path) if enable_wildcard else None
+        
+        texts = []
+        infos = []
+        for k, (text, _, info) in enumerate(self.batch_selections(selection, selection_mode, preset_index, seed, count)):
+            text, info = self.expand_selected_text(text, info, current_file, keyword, keyword_mode, selection_mode, seed + k)
+            texts.append(text)
+            infos.append(info)
+        return (texts, selection["preset_list"], infos)
+
+
+class PromptPresetCursors:
+    """
+    Inspect or reset the stored cursors of Sequential (continue), Shuffle
+    and sequential wildcard expansion
+    """
+    
+    CURSOR_KINDS = ["All", "continue", "shuffle", "wildcard"]
+    
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "action": (["List", "Reset"], {"default": "List"}),
+                "kind": (cls.CURSOR_KINDS, {"default": "All"}),
+                "key_prefix": ("STRING", {"default": "", "multiline": False}),
+            }
+        }
+    
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("cursors",)
+    FUNCTION = "run"
+    CATEGORY = "text"
+    OUTPUT_NODE = True
+    
+    @classmethod
+    def IS_CHANGED(cls, **kwargs):
+        # Cursors change between executions without any input changing
+        return float("nan")
+    
+    def run(self, action, kind, key_prefix):
+        """List or reset the cursors whose state key starts with key_prefix"""
+        kind = None if kind == "All" else kind
+        if action == "Reset":
+            removed = reset_cursors(kind, key_prefix)
+            print(f"[Prompt Preset Selector] Reset {removed} cursor(s)")
+            return (f"Reset {removed} cursor(s)",)
+        
+        cursors = list_cursors(kind, key_prefix)
+        lines = [f"{cursor_kind}: {key} = {value}" for cursor_kind, key, value in cursors]
+        lines.append(f"{len(cursors)} cursor(s)")
+        return ("\n".join(lines),)
+
+
+_preset_watcher = None
+
+
+def start_preset_watcher():
+    """
+    Start the PresetFileWatcher over the preset and wildcard directories (once)
+    Cached files are re-parsed and re-indexed on the watcher thread as soon
+    as they change, so executions find them up to date
+    """
+    global _preset_watcher
+    if _preset_watcher is not None:
+        return _preset_watcher
+    
+    selector = PromptPresetSelectorWithWildcard.shared_instance()
+    directories = [directory for directory in (PRESET_DIR, get_wildcard_dir()) if directory and directory.is_dir()]
+    
+    def on_change(path):
+        if selector.refresh_preset_entry(path):
+            print(f"[Prompt Preset Selector] Reloaded changed preset file: {path.name}")
+    
+    def on_remove(path):
+        _preset_file_cache.invalidate(path.resolve())
+    
+    _preset_watcher = PresetFileWatcher(directories, on_change, on_remove)
+    _preset_watcher.start()
+    mode = "inotify" if INOTIFY_AVAILABLE else f"polling every {WATCH_INTERVAL_SECONDS:g}s"
+    print(f"[Prompt Preset Selector] Watching {len(directories)} preset director{'y' if len(directories) == 1 else 'ies'} ({mode})")
+    return _preset_watcher
+
+
+def warm_up_preset_files(max_workers=WARM_UP_WORKERS):
+    """
+    Load and index the preset files (presets and wildcards directories, so
+    every file a __name__ wildcard can reference) in a bounded thread pool
+    Only as many files as the cache holds are warmed, top-level files first;
+    the rest would just evict the earlier ones again
+    Runs in a background thread, which is returned; nothing waits for it
+    """
+    selector = PromptPresetSelectorWithWildcard.shared_instance()
+    
+    def warm(name):
+        start = time.perf_counter()
+        entry = selector.warm_preset_file(name)
+        return name, entry, time.perf_counter() - start
+    
+    def select_files():
+        # Shallow files first, then by name, until either cache limit is reached
+        selected = []
+        total_bytes = 0
+        for name in sorted(list_preset_files(), key=lambda name: (name.count('/'), name)):
+            if len(selected) >= _preset_file_cache.max_entries:
+                break
+            version = file_fingerprint(resolve_preset_path(name))
+            size = version[1] if version else 0
+            if total_bytes + size > _preset_file_cache.max_bytes:
+                continue
+            total_bytes += size
+            selected.append(name)
+        return selected
+    
+    def run():
+        start = time.perf_counter()
+        names = list_preset_files()
+        selected = select_files()
+        if len(selected) < len(names):
+            print(f"[Prompt Preset Selector] Warning: Warm-up skips {len(names) - len(selected)} of {len(names)} preset files "
+                  f"that do not fit in the cache (raise PROMPT_PRESET_CACHE_MAX_FILES / PROMPT_PRESET_CACHE_MAX_BYTES to warm them)")
+        
+        paths = []
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="PromptPresetWarmUp") as pool:
+            for name, entry, seconds in pool.map(warm, selected):
+                count = len(entry.lines) if entry else 0
+                print(f"[Prompt Preset Selector] Warm-up: {name} ({count} presets) in {seconds * 1000:.0f} ms")
+                if entry is not None:
+                    paths.append(entry.path)
+        
+        # Executions running meanwhile may have evicted some of them again
+        cached = sum(1 for path in paths if _preset_file_cache.peek(path) is not None)
+        print(f"[Prompt Preset Selector] Warm-up finished: {cached} of {len(names)} files cached in {time.perf_counter() - start:.2f} s")
+    
+    thread = threading.Thread(target=run, name="PromptPresetWarmUp", daemon=True)
+    thread.start()
+    return thread
 
 
 # Register the node
 NODE_CLASS_MAPPINGS = {
     "PromptPresetSelector": PromptPresetSelector,
-    "PromptPresetSelectorWithWildcard": PromptPresetSelectorWithWildcard
+    "PromptPresetSelectorWithWildcard": PromptPresetSelectorWithWildcard,
+    "PromptPresetSelectorBatch": PromptPresetSelectorBatch,
+    "PromptPresetSelectorWithWildcardBatch": PromptPresetSelectorWithWildcardBatch,
+    "PromptPresetCursors": PromptPresetCursors
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "PromptPresetSelector": "Prompt Preset Selector",
-    "PromptPresetSelectorWithWildcard": "Prompt Preset Selector (Wildcard)"
+    "PromptPresetSelectorWithWildcard": "Prompt Preset Selector (Wildcard)",
+    "PromptPresetSelectorBatch": "Prompt Preset Selector (Batch)",
+    "PromptPresetSelectorWithWildcardBatch": "Prompt Preset Selector (Wildcard, Batch)",
+    "PromptPresetCursors": "Prompt Preset Cursors"
 }
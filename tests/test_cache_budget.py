@@ -0,0 +1,70 @@
+"""
+Derived structures (search index, preset list, ...) count against the byte budget
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import nodes  # noqa: E402
+
+LINES = 5000
+
+
+@pytest.fixture
+def preset_files(tmp_path):
+    paths = []
+    for k in range(2):
+        path = tmp_path / f"presets{k}.txt"
+        path.write_text("".join(f"Line {i} with Words {i * 7}\n" for i in range(LINES)), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def load(cache, path):
+    return cache.get(path, nodes.PromptPresetSelector().load_txt_presets)
+
+
+def assert_consistent(cache):
+    assert cache._total_bytes == sum(entry.nbytes for entry in cache._entries.values())
+
+
+def test_derived_structures_are_charged(preset_files):
+    cache = nodes.PresetFileCache(max_entries=8, max_bytes=1 << 30)
+    entry = load(cache, preset_files[0])
+    base = cache._total_bytes
+
+    entry.search_index.find("words 7")
+    entry.preset_list
+    assert entry.derived_bytes > 0
+    assert cache._total_bytes == base + entry.derived_bytes
+    assert_consistent(cache)
+
+
+def test_charges_evict_older_entries(preset_files):
+    probe = load(nodes.PresetFileCache(), preset_files[1])
+    probe.search_index.find("words 7")
+    # Room for the second file with its index, but not for the first as well
+    cache = nodes.PresetFileCache(max_entries=8, max_bytes=probe.nbytes + 1024)
+    first = load(cache, preset_files[0])
+    second = load(cache, preset_files[1])
+    assert cache.peek(preset_files[0]) is first
+
+    second.search_index.find("words 7")
+    assert cache.peek(preset_files[0]) is None
+    assert cache.peek(preset_files[1]) is second
+    assert_consistent(cache)
+
+    # Charges to an entry that is no longer cached leave the budget alone
+    first.preset_list
+    assert_consistent(cache)
+
+
+def test_warm_up_builds_postings_but_not_the_list(preset_files):
+    selector = nodes.PromptPresetSelectorWithWildcard()
+    entry = selector.warm_preset_file(str(preset_files[0]))
+    assert entry.search_index._postings is not None
+    assert entry._preset_list is None
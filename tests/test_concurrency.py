@@ -0,0 +1,75 @@
+"""
+Stress tests: cursors advanced from a thread pool must not lose updates
+
+Every mode below walks a cycle of LINES positions; RUNS executions from
+THREADS workers must hit each position exactly RUNS // LINES times.
+"""
+
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import nodes  # noqa: E402
+
+THREADS = 32
+RUNS = 2000
+LINES = 500
+
+
+@pytest.fixture(autouse=True)
+def frequent_thread_switches():
+    # Switch threads as often as possible so races show up
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    nodes.reset_cursors()
+    yield
+    sys.setswitchinterval(interval)
+    nodes.reset_cursors()
+
+
+@pytest.fixture
+def preset_file(tmp_path):
+    path = tmp_path / "presets.txt"
+    path.write_text("".join(f"line {i}\n" for i in range(LINES)), encoding="utf-8")
+    return str(path)
+
+
+def run_parallel(fn):
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        return list(pool.map(fn, range(RUNS)))
+
+
+def assert_full_cycles(results):
+    counts = Counter(results)
+    assert len(counts) == LINES
+    assert set(counts.values()) == {RUNS // LINES}
+
+
+def test_sequential_continue_cursor(preset_file):
+    selector = nodes.PromptPresetSelector()
+    results = run_parallel(
+        lambda _: selector.select_preset("", preset_file, "", "OFF", "Sequential (continue)", 0, 0)[0]
+    )
+    assert_full_cycles(results)
+
+
+def test_shuffle_cursor(preset_file):
+    selector = nodes.PromptPresetSelector()
+    results = run_parallel(
+        lambda _: selector.select_preset("", preset_file, "", "OFF", "Shuffle", 0, 7)[0]
+    )
+    assert_full_cycles(results)
+
+
+def test_sequential_wildcard_cursor():
+    selector = nodes.PromptPresetSelectorWithWildcard()
+    template = "{" + "|".join(f"choice {i}" for i in range(LINES)) + "}"
+    results = run_parallel(
+        lambda _: selector.expand_wildcards(template, 0, "Sequential", "test_concurrency")
+    )
+    assert_full_cycles(results)
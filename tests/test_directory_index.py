@@ -0,0 +1,75 @@
+"""
+PresetDirectoryIndex walks a preset tree, following symlinked folders once
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import nodes  # noqa: E402
+
+
+def make_symlink(target, link):
+    try:
+        os.symlink(target, link, target_is_directory=True)
+    except (OSError, NotImplementedError) as e:
+        pytest.skip(f"symlinks unavailable: {e}")
+
+
+def test_symlink_loop_is_listed_once(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.txt").write_text("a\n", encoding="utf-8")
+    (tmp_path / "sub" / "b.txt").write_text("b\n", encoding="utf-8")
+    make_symlink(tmp_path, tmp_path / "sub" / "loop")
+
+    index = nodes.PresetDirectoryIndex(str(tmp_path))
+    assert index.names() == {"a.txt", "sub/b.txt"}
+
+
+def test_symlinked_folder_is_followed(tmp_path):
+    presets = tmp_path / "presets"
+    shared = tmp_path / "shared"
+    presets.mkdir()
+    shared.mkdir()
+    (shared / "c.yaml").write_text("c: [x]\n", encoding="utf-8")
+    make_symlink(shared, presets / "shared")
+
+    index = nodes.PresetDirectoryIndex(str(presets))
+    assert index.names() == {"shared/c.yaml"}
+    assert index.lookup("shared/c.yaml") == presets / "shared" / "c.yaml"
+
+
+@pytest.fixture
+def preset_tree(tmp_path):
+    for name in ("top.txt", "a/x.txt", "a/b/deep.txt", "c/y.yaml"):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"line {name}\n", encoding="utf-8")
+    return tmp_path
+
+
+def relative_matches(root, pattern):
+    return [path.relative_to(root).as_posix() for path in nodes.resolve_corpus_paths(f"{root}/{pattern}")]
+
+
+def test_absolute_glob_stays_within_pattern_depth(preset_tree):
+    assert relative_matches(preset_tree, "*.txt") == ["top.txt"]
+    assert relative_matches(preset_tree, "*/*.txt") == ["a/x.txt"]
+    assert relative_matches(preset_tree, "**/*.txt") == ["a/b/deep.txt", "a/x.txt", "top.txt"]
+    assert relative_matches(preset_tree, "") == ["a/b/deep.txt", "a/x.txt", "c/y.yaml", "top.txt"]
+
+    index = nodes._get_absolute_directory_index(str(preset_tree), 0)
+    assert index.names() == {"top.txt"}
+
+
+def test_absolute_directory_indexes_are_bounded(tmp_path):
+    for k in range(nodes.DIRECTORY_INDEX_CACHE_MAX + 5):
+        folder = tmp_path / f"folder{k}"
+        folder.mkdir()
+        (folder / "p.txt").write_text("p\n", encoding="utf-8")
+        nodes.resolve_corpus_paths(f"{folder}/*.txt")
+    assert len(nodes._absolute_directory_indexes) <= nodes.DIRECTORY_INDEX_CACHE_MAX
@@ -0,0 +1,51 @@
+"""
+Large .txt files are indexed and read on demand (PROMPT_PRESET_MMAP_MIN_BYTES)
+
+A file rewritten in place while a selection still holds its lines must not
+crash the process (a live mmap used to die with SIGBUS), so the scenario runs
+in a subprocess and its exit status is checked.
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LINES = 20000
+
+SCRIPT = textwrap.dedent("""
+    import sys
+    sys.path.insert(0, sys.argv[1])
+    import nodes
+
+    path = sys.argv[2]
+    selector = nodes.PromptPresetSelector()
+    selection, _ = selector.prepare_selection(path, "", "", "OFF", "Off")
+    assert isinstance(selection["entry"].lines, nodes.IndexedTxtLines)
+
+    # Truncate and rewrite the same inode while the selection is still held
+    with open(path, "r+b") as f:
+        f.truncate(0)
+        f.write(b"short\\n")
+
+    selector.select_from(selection, "Manual", len(selection["entry"].lines) - 1, 0)
+    print(selector.select_preset(path, "", "", "OFF", "Manual", 0, 0, "Off")[0])
+""")
+
+
+def test_rewrite_in_place_while_selected(tmp_path):
+    path = tmp_path / "large.txt"
+    path.write_text("".join(f"preset line {i}\n" for i in range(LINES)), encoding="utf-8")
+    env = dict(
+        os.environ,
+        PROMPT_PRESET_MMAP_MIN_BYTES="1",
+        PROMPT_PRESET_CACHE_DIR=str(tmp_path / "cache"),
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT, str(REPO_ROOT), str(path)],
+        env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "short"
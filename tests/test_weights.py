@@ -0,0 +1,34 @@
+"""
+Weighted YAML items are written "weight::text" and must read back exactly
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import nodes  # noqa: E402
+
+
+@pytest.mark.parametrize("weight", [1000000, 1234567, 0.5, 1e16, 1e-05, 123456789.125])
+def test_weight_round_trip(weight):
+    selector = nodes.PromptPresetSelector()
+    line = selector.yaml_item_to_preset({"text": "dim", "weight": weight}, "styles:")
+    assert nodes.split_weight(line) == (float(weight), "styles:dim")
+
+
+@pytest.mark.parametrize("weight", ["inf", "nan"])
+def test_non_finite_weight_is_ignored(weight):
+    selector = nodes.PromptPresetSelector()
+    assert selector.yaml_item_to_preset({"text": "dim", "weight": weight}) == "dim"
+
+
+def test_large_weight_draw_is_not_literal(tmp_path):
+    pytest.importorskip("yaml")
+    path = tmp_path / "weights.yaml"
+    path.write_text("styles:\n  - {text: bright, weight: 1000000}\n  - {text: dim, weight: 1}\n", encoding="utf-8")
+    selector = nodes.PromptPresetSelector()
+    for seed in range(20):
+        assert selector.select_preset(str(path), "", "", "OFF", "Random", 0, seed)[0] == "bright"
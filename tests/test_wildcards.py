@@ -0,0 +1,30 @@
+"""
+{text} groups keep or lose their braces as in the original expander
+
+It resolved the innermost group first while the text still contained a |,
+so a group loses its braces if a choice comes after it or the text has a
+literal |. Choices below have identical options so the output is fixed.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import nodes  # noqa: E402
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("{a} {b|b}", "a b"),
+    ("{b|b} {a}", "b {a}"),
+    ("x {a}", "x {a}"),
+    ("{a} | x", "a | x"),
+    ("{{a} x|{a} x}", "a x"),
+    ("{{c }|{c }}d", "cd"),
+    ("{{a}} {b|b} {c}", "a b {c}"),
+])
+def test_group_braces(text, expected):
+    selector = nodes.PromptPresetSelectorWithWildcard()
+    assert selector.expand_wildcards(text, 0, "Random", "test_wildcards") == expected